@@ -0,0 +1,210 @@
+import os
+import json
+import zlib
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from point_sampling import get_non_dominated_points, sample_dominated_points
+from main import get_kink_points, dist_to_kink_points_batch
+from profiling import profile_kink_points
+
+RESULTS_DIR = "../performance_results"
+SUMMARY_FILE = "summary.csv"
+
+# columns identifying a benchmark configuration
+CONFIG_COLUMNS = ["dim", "front_type", "m"]
+
+# memory and structure statistics of the runs, whose maxima over the repeats are added to the summary
+MEMORY_COLUMNS = ["kink_rss_delta", "query_rss_delta", "kink_peak_bytes", "query_peak_bytes",
+                  "max_sorted_list_size", "max_dominance_index_size", "n_candidates", "large_slice_deletions"]
+
+
+def run_benchmarks(dims, front_types, ms, n_repeats=10, n_warmup=1, time_limit=60, workers=None,
+                   results_dir=RESULTS_DIR, track_memory=True):
+    """ Benchmarks every (dim, front type, m) configuration in a process pool and writes the summary.
+    Each configuration doubles the front size until a run takes longer than time_limit seconds. The runs
+    are appended to one JSON lines file per configuration as they finish, so an interrupted sweep resumes
+    where it stopped when it is started again. With track_memory, the measured runs also record their memory
+    use and the sizes of the intermediate structures, see benchmark_run. Returns the summary DataFrame. """
+    os.makedirs(results_dir, exist_ok=True)
+    configs = [(dim, front_type, m) for dim in dims for front_type in front_types for m in ms]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(benchmark_config, dim, front_type, m, n_repeats, n_warmup, time_limit,
+                                   results_dir, track_memory): (dim, front_type, m)
+                   for dim, front_type, m in configs}
+        for future in as_completed(futures):
+            dim, front_type, m = futures[future]
+            future.result()
+            print(f"Finished {dim}-dim {front_type} front m={m}")
+
+    return write_summary(results_dir)
+
+
+def results_path(results_dir, dim, front_type, m):
+    return os.path.join(results_dir, f"runs_dim={dim}_front={front_type}_m={m}.jsonl")
+
+
+def read_runs(path):
+    """ Returns the runs recorded in the JSON lines file, ignoring a line cut off by an interruption. """
+    runs = []
+    if not os.path.exists(path):
+        return runs
+    with open(path) as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return runs
+
+
+def benchmark_config(dim, front_type, m, n_repeats, n_warmup, time_limit, results_dir=RESULTS_DIR,
+                     track_memory=True):
+    """ Runs the benchmark of one configuration, skipping the runs already recorded in its results file.
+    Before a front size is started, its time is extrapolated from the growth between the last two sizes,
+    and the sweep stops if the extrapolated time exceeds time_limit. """
+    path = results_path(results_dir, dim, front_type, m)
+    runs = read_runs(path)
+    done = {(run["front_size"], run["repeat"], run["warmup"]): run for run in runs}
+
+    mean_times = []
+    front_size = 1
+    # rewrite the complete runs, dropping a line cut off by an interruption
+    with open(path + ".tmp", "w") as f:
+        f.writelines(json.dumps(run) + "\n" for run in runs)
+    os.replace(path + ".tmp", path)
+
+    with open(path, "a") as f:
+        while True:
+            if len(mean_times) >= 2 and mean_times[-1] ** 2 / mean_times[-2] > time_limit * 1e9:
+                return
+
+            times = []
+            schedule = [(repeat, True) for repeat in range(n_warmup)] + [(repeat, False) for repeat in range(n_repeats)]
+            for repeat, warmup in schedule:
+                run = done.get((front_size, repeat, warmup))
+                if run is None:
+                    run = benchmark_run(dim, front_type, m, front_size, repeat, warmup, track_memory and not warmup)
+                    f.write(json.dumps(run) + "\n")
+                    f.flush()
+                if run["time_ns"] > time_limit * 1e9:
+                    return
+                if not warmup:
+                    times.append(run["time_ns"])
+
+            mean_times.append(max(np.mean(times), 1))
+            front_size *= 2
+
+
+def benchmark_run(dim, front_type, m, front_size, repeat, warmup, track_memory=False):
+    """ Times the computation of the kink points of one random front and the distances of m random
+    dominated points, in total and per phase, and records the change of the resident set size in each phase.
+    The random state depends only on the run, so a resumed sweep sees the same fronts.
+
+    With track_memory, the phases are repeated twice without being timed: once with tracemalloc, for the
+    peak of the memory allocated in each phase (kink_peak_bytes, query_peak_bytes), and once profiled (see
+    profiling.SweepProfile), for the largest SortedList and DominanceIndex states, the number of kink
+    candidates and the number of large SortedList slice deletions (a heuristic for rebuilds). """
+    seed = zlib.crc32(f"{dim},{front_type},{m},{front_size},{repeat},{warmup}".encode())
+    np.random.seed(seed)
+    front = get_non_dominated_points(front_size, dim, mode=front_type)
+    test_points = sample_dominated_points(front, dim, m)
+
+    rss0 = current_rss()
+    t0 = time.perf_counter_ns()
+    kink_points = get_kink_points(front, dim)
+    t1 = time.perf_counter_ns()
+    rss1 = current_rss()
+    dist_to_kink_points_batch(kink_points, test_points, dim)
+    t2 = time.perf_counter_ns()
+    rss2 = current_rss()
+
+    run = {"dim": dim, "front_type": front_type, "m": m, "front_size": front_size, "repeat": repeat,
+           "warmup": warmup, "time_ns": t2 - t0, "kink_time_ns": t1 - t0, "query_time_ns": t2 - t1,
+           "n_kink_points": len(kink_points), "kink_rss_delta": rss1 - rss0, "query_rss_delta": rss2 - rss1}
+    if track_memory:
+        run.update(traced_memory(front, test_points, dim))
+        run.update(structure_sizes(front, dim))
+    return run
+
+
+def current_rss():
+    """ Returns the resident set size of the process in bytes, or NaN where /proc is not available
+    (the peak from getrusage would not give the change within a phase). """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return float("nan")
+
+
+def traced_memory(front, test_points, dim):
+    """ Returns the peaks of the memory allocated (above the memory in use at the start of the phase)
+    while computing the kink points and while computing the distances. """
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        kink_points = get_kink_points(front, dim)
+        kink_peak = tracemalloc.get_traced_memory()[1] - start
+
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        dist_to_kink_points_batch(kink_points, test_points, dim)
+        query_peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return {"kink_peak_bytes": kink_peak, "query_peak_bytes": query_peak}
+
+
+def structure_sizes(front, dim):
+    _, report = profile_kink_points(front, dim)
+    return {"max_sorted_list_size": report["max_sorted_list_size"],
+            "max_dominance_index_size": report["max_dominance_index_size"],
+            "n_candidates": sum(level["candidates"] for level in report["levels"].values()),
+            "large_slice_deletions": report["large_slice_deletions"]}
+
+
+def load_runs(results_dir=RESULTS_DIR):
+    """ Returns a DataFrame with all the recorded runs in the results directory, without the warm-up runs,
+    and with their times in seconds in the column time. """
+    runs = []
+    for name in sorted(os.listdir(results_dir)):
+        if name.startswith("runs_") and name.endswith(".jsonl"):
+            runs.extend(read_runs(os.path.join(results_dir, name)))
+
+    # the columns of the older runs without the memory statistics are missing
+    runs = pd.DataFrame(runs)
+    columns = CONFIG_COLUMNS + ["front_size", "repeat", "warmup", "time_ns", "n_kink_points"]
+    runs = runs.reindex(columns=columns + [column for column in runs.columns if column not in columns])
+    runs = runs[~runs["warmup"].astype(bool)].copy()
+    runs["time"] = runs["time_ns"] / 1e9
+    return runs
+
+
+def write_summary(results_dir=RESULTS_DIR):
+    """ Aggregates the recorded runs (without the warm-up runs) into one row per configuration and front
+    size, with the time statistics in seconds and the maxima of the memory statistics, and writes them to
+    SUMMARY_FILE in the results directory. """
+    runs = load_runs(results_dir)
+    columns = CONFIG_COLUMNS + ["front_size"]
+
+    memory = {column: (column, "max") for column in MEMORY_COLUMNS if column in runs}
+    summary = runs.groupby(columns).agg(
+        n_repeats=("time", "size"), mean=("time", "mean"), std=("time", "std"), min=("time", "min"),
+        median=("time", "median"), max=("time", "max"), n_kink_points=("n_kink_points", "mean"),
+        **memory).reset_index()
+    summary.to_csv(os.path.join(results_dir, SUMMARY_FILE), index=False)
+    return summary
+
+
+def load_summary(results_dir=RESULTS_DIR):
+    return pd.read_csv(os.path.join(results_dir, SUMMARY_FILE))
+
+
+if __name__ == '__main__':
+    run_benchmarks(dims=[3, 4, 5, 6], front_types=["linear", "spherical", "worst_case", "adversarial"],
+                   ms=[1, 10, 100])
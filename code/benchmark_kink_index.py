@@ -0,0 +1,53 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from point_sampling import get_non_dominated_points, sample_random_dominated_point
+from main import get_kink_points, dist_to_kink_points_batch
+from kink_index import KinkIndex
+
+
+def benchmark_all():
+    front_sizes = {3: [1000, 4000, 16000], 4: [50, 100, 200, 400], 5: [20, 40, 80]}
+    for dim, sizes in front_sizes.items():
+        for front_type in ["linear", "spherical", "worst_case"]:
+            print(f"Benchmarking kink index for {dim}-dim {front_type} front")
+            benchmark_kink_index(dim, front_type, sizes)
+
+
+def benchmark_kink_index(dim, front_type, front_sizes, n_queries=100):
+    """ Compares the linear scan over the kink points with the KinkIndex and reports after
+    how many queries building the index pays for itself. """
+    results = []
+    for front_size in front_sizes:
+        front = get_non_dominated_points(front_size, dim, mode=front_type)
+        kink_points = np.array(get_kink_points(front, dim))
+        test_points = [sample_random_dominated_point(front, dim) for _ in range(n_queries)]
+
+        t0 = time.perf_counter()
+        scan_distances = [dist_to_kink_points_batch(kink_points, point, dim)[0] for point in test_points]
+        t1 = time.perf_counter()
+        index = KinkIndex(kink_points, dim)
+        t2 = time.perf_counter()
+        index_distances = index.distances(test_points)
+        t3 = time.perf_counter()
+        assert np.array_equal(scan_distances, index_distances), "index and linear scan disagree"
+
+        scan_time = (t1 - t0) / n_queries
+        build_time = t2 - t1
+        index_time = (t3 - t2) / n_queries
+        break_even = build_time / (scan_time - index_time) if scan_time > index_time else np.inf
+        results.append((front_size, len(kink_points), build_time, scan_time, index_time, break_even))
+        print(f"  n={front_size:6d} v={len(kink_points):9d} build={build_time:.5f}s "
+              f"scan={scan_time:.6f}s index={index_time:.6f}s break-even={break_even:.1f} queries")
+
+    results = pd.DataFrame(results, columns=["front_size", "n_kink_points", "build_time",
+                                             "scan_time", "index_time", "break_even_queries"])
+    os.makedirs("../performance_results", exist_ok=True)
+    results.to_csv(f"../performance_results/kink_index_dim={dim}_front={front_type}.csv", index=False)
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_all()
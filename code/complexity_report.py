@@ -0,0 +1,106 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from benchmark import RESULTS_DIR, CONFIG_COLUMNS, load_runs
+
+REPORT_FILE = "complexity.csv"
+BASELINE_FILE = "complexity_baseline.json"
+
+# the runs on smaller fronts are dominated by constant overheads and are left out of the fits
+MIN_FRONT_SIZE = 16
+
+# how much the fitted exponent may exceed the theoretical or the baseline exponent
+EXPONENT_TOLERANCE = 0.25
+
+CONFIDENCE = 0.95
+
+
+class ComplexityRegression(Exception):
+    """ Raised when a fitted scaling exponent is significantly larger than the theoretical exponent or the
+    exponent in the baseline. """
+
+
+def theoretical_exponent(dim):
+    """ Returns the exponent of the proven time bounds: O(n log n) in 3D, where the logarithmic factor is
+    covered by the tolerance, and O(n^(D - 1)) for D >= 4. """
+    return 1 if dim <= 3 else dim - 1
+
+
+def fit_exponents(runs, min_front_size=MIN_FRONT_SIZE, confidence=CONFIDENCE):
+    """ Fits log(time) = log(c) + k log(n) to the runs of every configuration by least squares and returns a
+    DataFrame with the exponent k, the bounds of its confidence interval and the theoretical exponent.
+    The configurations with fewer than three distinct front sizes of at least min_front_size are skipped. """
+    rows = []
+    runs = runs[runs["front_size"] >= min_front_size]
+    for config, group in runs.groupby(CONFIG_COLUMNS):
+        if group["front_size"].nunique() < 3:
+            continue
+        fit = stats.linregress(np.log(group["front_size"]), np.log(np.maximum(group["time"], 1e-9)))
+        margin = stats.t.ppf((1 + confidence) / 2, len(group) - 2) * fit.stderr
+        rows.append(dict(zip(CONFIG_COLUMNS, config), exponent=fit.slope, ci_low=fit.slope - margin,
+                         ci_high=fit.slope + margin, n_runs=len(group),
+                         max_front_size=group["front_size"].max(), theoretical=theoretical_exponent(config[0])))
+    return pd.DataFrame(rows, columns=CONFIG_COLUMNS + ["exponent", "ci_low", "ci_high", "n_runs", "max_front_size",
+                                                         "theoretical"])
+
+
+def config_key(row):
+    return f"dim={row['dim']}_front={row['front_type']}_m={row['m']}"
+
+
+def check_exponents(fits, baseline=None, tolerance=EXPONENT_TOLERANCE):
+    """ Adds the baseline exponents and the verdicts to the fits. A configuration fails if even the lower
+    bound of the confidence interval of its exponent exceeds the theoretical exponent or the baseline
+    exponent by more than the tolerance. """
+    baseline = baseline or {}
+    fits = fits.copy()
+    fits["baseline"] = [baseline.get(config_key(row), np.nan) for _, row in fits.iterrows()]
+    fits["above_theory"] = fits["ci_low"] > fits["theoretical"] + tolerance
+    fits["above_baseline"] = fits["ci_low"] > fits["baseline"] + tolerance
+    fits["ok"] = ~(fits["above_theory"] | fits["above_baseline"])
+    return fits
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(fits, path):
+    """ Stores the fitted exponents as the baseline for later reports. """
+    with open(path, "w") as f:
+        json.dump({config_key(row): float(row["exponent"]) for _, row in fits.iterrows()}, f, indent=2)
+
+
+def complexity_report(results_dir=RESULTS_DIR, baseline_path=None, tolerance=EXPONENT_TOLERANCE,
+                      min_front_size=MIN_FRONT_SIZE, update_baseline=False):
+    """ Fits the exponents of the benchmark runs in the results directory, writes the report to REPORT_FILE
+    there and raises ComplexityRegression listing the failing configurations, if there are any.
+    With update_baseline the fitted exponents replace the baseline, which is by default BASELINE_FILE in the
+    results directory. Returns the report. """
+    if baseline_path is None:
+        baseline_path = os.path.join(results_dir, BASELINE_FILE)
+
+    fits = fit_exponents(load_runs(results_dir), min_front_size)
+    report = check_exponents(fits, load_baseline(baseline_path), tolerance)
+    report.to_csv(os.path.join(results_dir, REPORT_FILE), index=False)
+
+    failed = report[~report["ok"]]
+    if len(failed) > 0:
+        lines = [f"{config_key(row)}: exponent {row['exponent']:.2f} "
+                 f"[{row['ci_low']:.2f}, {row['ci_high']:.2f}], theoretical {row['theoretical']}, "
+                 f"baseline {row['baseline']:.2f}" for _, row in failed.iterrows()]
+        raise ComplexityRegression("scaling exponents above the expected ones:\n" + "\n".join(lines))
+
+    if update_baseline:
+        save_baseline(fits, baseline_path)
+    return report
+
+
+if __name__ == '__main__':
+    print(complexity_report().to_string(index=False))
@@ -0,0 +1,101 @@
+import os
+import numpy as np
+
+from point_sampling import square_grid, grid_net_chunks, epsilon_net_rec_chunks, epsilon_net_rec_size, NET_CHUNK_SIZE
+from utils import LRUCache
+
+# maximal number of unit nets and their total size kept in memory by the default EpsilonNetCache
+NET_CACHE_ENTRIES = 8
+NET_CACHE_BYTES = 2 ** 28
+
+
+class ScaledNet:
+    """ Epsilon net of the sphere of the given radius, given by a unit net, which is scaled only chunk by
+    chunk when it is iterated, so the cached unit net is never copied as a whole. If the unit net is
+    None (it was too large to be cached), the chunks of size points are generated by unit_chunks(chunk_size)
+    and scaled one by one. """
+
+    def __init__(self, unit_net, radius, dim, unit_chunks=None, size=None):
+        self.unit_net = unit_net
+        self.radius = radius
+        self.dim = dim
+        self.unit_chunks = unit_chunks
+        self.size = size
+
+    def __len__(self):
+        if self.unit_net is None:
+            return self.size
+        return len(self.unit_net)
+
+    def chunks(self, chunk_size=NET_CHUNK_SIZE):
+        """ Generator of the points of the net in chunks of chunk_size points. """
+        if self.unit_net is None:
+            for chunk in self.unit_chunks(chunk_size):
+                yield chunk * self.radius
+            return
+        for start in range(0, len(self.unit_net), chunk_size):
+            yield self.unit_net[start:start + chunk_size] * self.radius
+
+
+class EpsilonNetCache(LRUCache):
+    """ Epsilon nets of the unit sphere, reused for all the radii: the net of the sphere of radius r with
+    epsilon e is the unit net with epsilon e / r, scaled by r. The square nets are keyed by the dimension
+    and the number of grid values per coordinate, which is determined by e / r, and the recursive nets by
+    the dimension and the angular step. The least recently used nets are evicted when there are more than
+    max_entries of them or they take more than max_bytes. If a directory is given, the unit nets are also
+    stored there as .npy files and memory-mapped when they are loaded, also by later processes. """
+
+    def __init__(self, max_entries=NET_CACHE_ENTRIES, max_bytes=NET_CACHE_BYTES, directory=None):
+        super().__init__(max_entries, max_bytes)
+        self.directory = directory
+
+    def square_net(self, radius, epsilon, dim):
+        """ Returns the ScaledNet with the points of epsilon_net_chunks(radius, epsilon, dim). """
+        n = len(square_grid(1, epsilon / radius, dim))
+        return self._net(("square", dim, n), radius, n ** dim - (n - 1) ** dim,
+                         lambda chunk_size=NET_CHUNK_SIZE: grid_net_chunks(n, 1.0, dim, chunk_size))
+
+    def recursive_net(self, radius, epsilon, dim):
+        """ Returns the ScaledNet with the points of point_sampling.epsilon_net(radius, epsilon, dim). """
+        h = (2 * epsilon) / (radius * np.power((dim - 1), 1 / 2))
+        return self._net(("recursive", dim, h), radius, epsilon_net_rec_size(h, dim),
+                         lambda chunk_size=NET_CHUNK_SIZE: epsilon_net_rec_chunks(h, dim, chunk_size))
+
+    def _net(self, key, radius, size, unit_chunks):
+        """ Returns the ScaledNet of the unit net with the given key and size, whose chunks are generated by
+        unit_chunks. Without a directory, unit nets larger than max_bytes are streamed instead of cached. """
+        dim = key[1]
+        if self.directory is None and size * dim * 8 > self.max_bytes:
+            return ScaledNet(None, radius, dim, unit_chunks, size)
+
+        unit_net = self.lookup(key)
+        if unit_net is None:
+            if self.directory is None:
+                unit_net = np.vstack(list(unit_chunks()))
+            else:
+                unit_net = self._load(key, unit_chunks, size)
+            self.put(key, unit_net)
+        return ScaledNet(unit_net, radius, dim)
+
+    def _load(self, key, unit_chunks, size):
+        """ Loads the unit net from the directory, after writing it there chunk by chunk into a memory-mapped
+        file if it is not there yet. """
+        path = os.path.join(self.directory, "unit_net_" + "_".join(map(str, key)) + ".npy")
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            out = np.lib.format.open_memmap(path + ".tmp.npy", mode="w+", dtype=np.float64, shape=(size, key[1]))
+            start = 0
+            for chunk in unit_chunks():
+                out[start:start + len(chunk)] = chunk
+                start += len(chunk)
+            out.flush()
+            del out
+            os.replace(path + ".tmp.npy", path)
+        return np.load(path, mmap_mode="r")
+
+    def value_nbytes(self, unit_net):
+        # memory-mapped nets only take the space of their pages that are in use
+        return 0 if isinstance(unit_net, np.memmap) else unit_net.nbytes
+
+
+net_cache = EpsilonNetCache()
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+
+inf = float('inf')
+
+# maximal number of kink points stored in one leaf of the index
+LEAF_SIZE = 256
+
+
+class KinkIndex:
+    """ Bounding-box tree over a set of kink points, used for answering distance queries
+    sqrt(sum(max(k_i - q_i, 0) ** 2)) without scanning all the kink points.
+
+    The distance is monotone in the kink point, so the distance to the lower corner of a
+    box is a lower bound for all the kink points inside it, and the boxes whose bound is
+    not smaller than the best distance found so far are never opened. The leaves are
+    evaluated in the same order of operations as dist_to_kink_points, so the index returns
+    exactly the same distances as the linear scan.
+    """
+
+    def __init__(self, kink_points, dim, leaf_size=LEAF_SIZE):
+        self.dim = dim
+        points = np.asarray(kink_points, dtype=float).reshape(-1, dim)
+
+        # node i covers points[start[i]:end[i]] and has its lower corner in lower[i];
+        # inner nodes have two children, leaves have None
+        self.lower = []
+        self.start = []
+        self.end = []
+        self.children = []
+
+        order = np.arange(len(points))
+        if len(points) > 0:
+            self._build(points, order, leaf_size)
+        self.points = points[order]
+        self.columns = [np.ascontiguousarray(self.points[:, i]) for i in range(dim)]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _new_node(self, points, start, end):
+        self.lower.append(tuple(float(x) for x in points.min(axis=0)))
+        self.start.append(start)
+        self.end.append(end)
+        self.children.append(None)
+        return len(self.lower) - 1
+
+    def _build(self, points, order, leaf_size):
+        """ Builds the tree by splitting the nodes along the widest coordinate at the median,
+        reordering the array order, so that every node covers a contiguous range of it. """
+        root = self._new_node(points, 0, len(order))
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            start, end = self.start[node], self.end[node]
+            if end - start <= leaf_size:
+                continue
+
+            node_points = points[order[start:end]]
+            split_dim = np.argmax(node_points.max(axis=0) - node_points.min(axis=0))
+            mid = (end - start) // 2
+            partition = np.argpartition(node_points[:, split_dim], mid)
+            order[start:end] = order[start:end][partition]
+
+            left = self._new_node(points[order[start:start + mid]], start, start + mid)
+            right = self._new_node(points[order[start + mid:end]], start + mid, end)
+            self.children[node] = (left, right)
+            stack.extend([left, right])
+
+    def _lower_bound(self, node, query_point):
+        """ Returns the squared distance of the query point to the lower corner of the node. """
+        return sum([max(self.lower[node][i] - query_point[i], 0) ** 2 for i in range(self.dim)])
+
+    def _leaf_min(self, node, query_point):
+        start, end = self.start[node], self.end[node]
+        sq_dist = np.zeros(end - start)
+        for i in range(self.dim):
+            diff = self.columns[i][start:end] - query_point[i]
+            np.maximum(diff, 0, out=diff)
+            sq_dist += diff * diff
+        return float(sq_dist.min())
+
+    def distance(self, query_point):
+        """ Returns the distance of the query point to the closest cone spanned by the
+        kink points. """
+        query_point = [float(x) for x in query_point]
+        if len(self.points) == 0:
+            return inf
+
+        min_sq_dist = inf
+        stack = [(self._lower_bound(0, query_point), 0)]
+        while stack:
+            bound, node = stack.pop()
+            if bound >= min_sq_dist:
+                continue
+
+            if self.children[node] is None:
+                min_sq_dist = min(min_sq_dist, self._leaf_min(node, query_point))
+                if min_sq_dist == 0:
+                    break
+                continue
+
+            # push the farther child first, so the closer one is opened first
+            bounds = [(self._lower_bound(child, query_point), child) for child in self.children[node]]
+            bounds.sort(reverse=True)
+            stack.extend([b for b in bounds if b[0] < min_sq_dist])
+
+        return math.sqrt(min_sq_dist)
+
+    def distances(self, query_points):
+        """ Returns an array with the distances of all the query points. """
+        return np.array([self.distance(point) for point in query_points])
@@ -0,0 +1,54 @@
+import os
+import json
+import numpy as np
+
+from utils import front_hash
+
+# version of the on-disk format written by save_kink_points
+FORMAT_VERSION = 1
+
+
+def metadata_path(path):
+    return f"{path}.json"
+
+
+def save_kink_points(path, kink_points, pareto_front, dim):
+    """ Saves the kink points of the pareto front to path, as a raw float64 .npy file of shape (v, dim),
+    next to a metadata header path + ".json" with the format version, the dimension, the number of
+    kink points and the hash of the front they were computed from. Both files are written to temporary
+    names and moved into place, the data first and the metadata last, so processes loading the file
+    concurrently never see a half-written array. """
+    kink_points = np.ascontiguousarray(np.asarray(kink_points, dtype=np.float64).reshape(-1, dim))
+    metadata = {
+        "version": FORMAT_VERSION,
+        "dim": dim,
+        "n_kink_points": len(kink_points),
+        "front_hash": front_hash(pareto_front, dim),
+    }
+    # the temporary names are unique per process, so concurrent writers do not mix their files
+    tmp = f".{os.getpid()}.tmp"
+    with open(path + tmp, "wb") as f:
+        np.save(f, kink_points, allow_pickle=False)
+    with open(metadata_path(path) + tmp, "w") as f:
+        json.dump(metadata, f)
+    os.replace(path + tmp, path)
+    os.replace(metadata_path(path) + tmp, metadata_path(path))
+
+
+def load_kink_points(path, pareto_front=None):
+    """ Loads the kink points saved by save_kink_points as a read-only memory-mapped (v, dim) array,
+    so the processes loading the same file share its pages instead of copying them. If the pareto
+    front is given, raises ValueError if the kink points were computed from a different front. """
+    with open(metadata_path(path)) as f:
+        metadata = json.load(f)
+    if metadata.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported kink point format version {metadata.get('version')} in {path}")
+
+    dim = metadata["dim"]
+    if pareto_front is not None and front_hash(pareto_front, dim) != metadata["front_hash"]:
+        raise ValueError(f"the kink points in {path} were computed from a different front")
+
+    kink_points = np.load(path, mmap_mode="r", allow_pickle=False)
+    if kink_points.dtype != np.float64 or kink_points.shape != (metadata["n_kink_points"], dim):
+        raise ValueError(f"the kink points in {path} do not match their metadata")
+    return kink_points
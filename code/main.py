@@ -1,20 +1,140 @@
 import math
+import time
+import heapq
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+import numpy as np
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from sortedcontainers import SortedList
 
 from visualization import visualize_kink_points
-from utils import weakly_dominates, state_dominates_point, strictly_dominates, get_dominated_points_bisect
+from utils import (weakly_dominates, state_dominates_point, strictly_dominates, get_dominated_points_bisect,
+                   staircase_dominates_point, dominated_mask, front_hash, DominanceIndex, LRUCache,
+                   minimal_points)
+from point_sampling import remove_dominated_points
 
 inf = float('inf')
 
-MAKE_EXPENSIVE_ASSERTS = True
+# engines of get_kink_points: "checked" validates the inputs and the intermediate states on every
+# level of the sweep, "fast" runs without any checks
+ENGINES = ("fast", "checked")
 
-def distance_to_pareto_front(pareto_front, query_point):
+# number of box subproblems remembered by each IncrementalKinkSet
+SUBPROBLEM_CACHE_SIZE = 64
+
+# maximal number of (query point, kink point) pairs evaluated at once in dist_to_kink_points_batch
+BATCH_CHUNK_SIZE = 2 ** 20
+
+# number of sweep segments per worker in get_kink_points, to balance the load between processes
+SEGMENTS_PER_WORKER = 4
+
+# number of query points read and evaluated at once in stream_distances_to_pareto_front
+STREAM_CHUNK_SIZE = 2 ** 14
+
+# maximal number of fronts and total size of their kink points kept by the default KinkPointCache
+KINK_CACHE_ENTRIES = 32
+KINK_CACHE_BYTES = 2 ** 28
+
+def distance_to_pareto_front(pareto_front, query_point, kink_points=None, cache=None, deadline=None,
+                             max_kink_points=None, fallback=None):
+    """ Returns the distance of the query point to the pareto front. The kink points of the front are
+    taken from the cache (by default the module-wide kink_point_cache, cache=False disables it),
+    unless they are given (e.g. as loaded by kink_storage.load_kink_points).
+
+    If computing the kink points runs past the deadline or the kink point budget (see kink_limits),
+    the KinkLimitExceeded is raised, or, if a fallback is given, fallback(pareto_front, query_point)
+    is returned instead, e.g. an approximate distance. Nothing is stored in the cache in that case. """
     dim = len(query_point)
-    if not any([weakly_dominates(point, query_point) for point in pareto_front]):
+    if not state_dominates_point(np.asarray(pareto_front, dtype=float), query_point):
         return 0
 
-    kink_points = get_kink_points(pareto_front, dim)
-    return dist_to_kink_points(kink_points, query_point, dim)
+    if kink_points is None:
+        try:
+            with kink_limits(deadline, max_kink_points):
+                kink_points = cached_kink_points(pareto_front, dim, cache)
+        except KinkLimitExceeded:
+            if fallback is None:
+                raise
+            return fallback(pareto_front, query_point)
+    return float(dist_to_kink_points_batch(kink_points, query_point, dim)[0])
+
+
+def distance_to_pareto_front_lazy(pareto_front, query_point):
+    """ Returns the same distance as distance_to_pareto_front, but walks the sweep over the front step by
+    step and stops as soon as none of the kink points that are still to be found can be closer than the
+    closest one found so far. Meant for fronts that are only queried a few times. In three dimensions the
+    kink points are cheap to compute, so all of them are computed. """
+    dim = len(query_point)
+    if dim == 3:
+        return distance_to_pareto_front(pareto_front, query_point)
+    if not state_dominates_point(np.asarray(pareto_front, dtype=float), query_point):
+        return 0
+
+    query_point = tuple(float(x) for x in query_point)
+    points = sorted(pareto_front, key=lambda x: x[dim - 1], reverse=True)
+    kink_candidates = IncrementalKinkSet(dim - 1)
+
+    # every kink point still to be found dominates one of the current candidates, so the smallest
+    # distance of a candidate to the projected query point is a lower bound for all of them;
+    # the candidates are kept in a heap, from which the removed ones are dropped lazily
+    bounds = [(sq_dist_to_kink_point(kp, query_point, dim - 1), kp) for kp in kink_candidates]
+    min_sq_dist = inf
+
+    steps = sweep_steps(points, kink_candidates)
+    for i, (point, found, added) in enumerate(steps):
+        for kink_point in found:
+            min_sq_dist = min(min_sq_dist, sq_dist_to_kink_point(kink_point, query_point, dim))
+        for kp in added:
+            heapq.heappush(bounds, (sq_dist_to_kink_point(kp, query_point, dim - 1), kp))
+        while bounds[0][1] not in kink_candidates.kink_points:
+            heapq.heappop(bounds)
+
+        lower_bound = bounds[0][0]
+        if lower_bound >= min_sq_dist:
+            return math.sqrt(min_sq_dist)
+
+        # below the query point the last coordinate adds nothing to the distance, so once the rest of
+        # the sweep is that low, each current candidate will be found at exactly its lower bound
+        if i + 1 < len(points) and point[-1] > points[i + 1][-1] and points[i + 1][-1] <= query_point[-1]:
+            return math.sqrt(min(min_sq_dist, lower_bound))
+
+    for kp in kink_candidates:
+        min_sq_dist = min(min_sq_dist, sq_dist_to_kink_point(kp + (0, ), query_point, dim))
+    return math.sqrt(min_sq_dist)
+
+
+def stream_distances_to_pareto_front(pareto_front, query_points, chunk_size=STREAM_CHUNK_SIZE, kink_points=None,
+                                     cache=None):
+    """ Yields the distances of the query points to the pareto front as arrays, one per chunk of at
+    most chunk_size query points. The query points can be any iterable of points (a list, a csv reader,
+    which yields strings) or an array such as a .npy memmap, which is sliced without being read whole.
+    The kink points are computed once (unless they are given or cached, as in distance_to_pareto_front),
+    and only one chunk of query points is in memory at a time. """
+    front = np.asarray(pareto_front, dtype=float)
+    dim = front.shape[1]
+    if kink_points is None:
+        kink_points = cached_kink_points(pareto_front, dim, cache)
+
+    if isinstance(query_points, np.ndarray):
+        chunks = (query_points[start:start + chunk_size] for start in range(0, len(query_points), chunk_size))
+    else:
+        iterator = iter(query_points)
+        chunks = iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=float).reshape(-1, dim)
+        distances = dist_to_kink_points_batch(kink_points, chunk, dim)
+        distances[~dominated_mask(front, chunk)] = 0
+        yield distances
+
+
+def sq_dist_to_kink_point(kink_point, query_point, dim):
+    """ Returns the squared distance of the query point to the cone of the kink point, in the first dim
+    coordinates, summed in the same order as in dist_to_kink_points. """
+    return sum([max(kink_point[i] - query_point[i], 0) ** 2 for i in range(dim)])
 
 
 def dist_to_kink_points(kink_points, query_point, dim):
@@ -26,6 +146,35 @@ def dist_to_kink_points(kink_points, query_point, dim):
     return math.sqrt(min_sq_dist)
 
 
+def dist_to_kink_points_batch(kink_points, query_points, dim, chunk_size=BATCH_CHUNK_SIZE):
+    """ Returns an array with the distances of all the query points to the kink points.
+    Both kink_points (v, dim) and query_points (m, dim) can be lists of tuples or arrays.
+    The m * v pairs are evaluated in blocks of at most chunk_size pairs, so the peak memory
+    stays bounded even for large fronts and many query points. """
+    kink_points = np.asarray(kink_points, dtype=float).reshape(-1, dim)
+    query_points = np.asarray(query_points, dtype=float).reshape(-1, dim)
+    min_sq_dist = np.full(len(query_points), inf)
+
+    kink_block = max(1, min(len(kink_points), chunk_size))
+    query_block = max(1, chunk_size // kink_block)
+
+    for q_start in range(0, len(query_points), query_block):
+        queries = query_points[q_start:q_start + query_block]
+        block_min = min_sq_dist[q_start:q_start + query_block]
+
+        for k_start in range(0, len(kink_points), kink_block):
+            kinks = kink_points[k_start:k_start + kink_block]
+            # sum the squares coordinate by coordinate, in the same order as dist_to_kink_points
+            sq_dist = np.zeros((len(queries), len(kinks)))
+            for i in range(dim):
+                diff = kinks[:, i] - queries[:, i, np.newaxis]
+                np.maximum(diff, 0, out=diff)
+                sq_dist += diff * diff
+            np.minimum(block_min, sq_dist.min(axis=1), out=block_min)
+
+    return np.sqrt(min_sq_dist)
+
+
 def assert_sorted(points, n_dim):
     # assert that the points are sorted by the last coordinate
     sorted_points = sorted(points, key=lambda x: x[n_dim - 1], reverse=True)
@@ -40,66 +189,241 @@ def assert_dimensionality(points, n_dim):
     for point in points:
         assert len(point) == n_dim, f"points must have {n_dim} dimensions; {point}"
 
-def get_kink_points(points, n_dim):
-    points = sorted(points, key=lambda x: x[n_dim - 1], reverse=True)
-    return get_kink_points_rec(points, n_dim)
-
-
-def get_kink_points_rec(points, d):
-    if MAKE_EXPENSIVE_ASSERTS:
+def get_kink_points(points, n_dim, workers=None, engine="fast", deadline=None, max_kink_points=None,
+                    fallback=None):
+    """ Returns the kink points of the points as a contiguous float64 array of shape (v, n_dim).
+    With workers > 1 and n_dim >= 4, the sweep is split into segments that are computed in
+    separate processes. The engine is one of ENGINES; "checked" asserts on every level that the points
+    are sorted and have the right dimension, and that the points removed from the states were dominated.
+
+    The sweep stops with a DeadlineExceeded once time.monotonic() passes the deadline, and with a
+    KinkBudgetExceeded once it finds more than max_kink_points kink points (see kink_limits). If a
+    fallback is given, fallback(points, n_dim) is returned instead of raising. """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine}, expected one of {ENGINES}")
+    if deadline is not None or max_kink_points is not None:
+        try:
+            with kink_limits(deadline, max_kink_points):
+                return get_kink_points(points, n_dim, workers, engine)
+        except KinkLimitExceeded:
+            if fallback is None:
+                raise
+            return fallback(points, n_dim)
+    checked = engine == "checked"
+
+    # the sweeps compare and hash the points, so arrays (e.g. loaded from .npy) are turned into tuples
+    if isinstance(points, np.ndarray):
+        points = points.tolist()
+    points = sorted(map(tuple, points), key=lambda x: x[n_dim - 1], reverse=True)
+    if workers is not None and workers > 1 and n_dim >= 4:
+        return get_kink_points_parallel(points, n_dim, workers, checked, active_limits.get())
+    return get_kink_points_rec(points, n_dim, checked)
+
+
+class KinkLimitExceeded(Exception):
+    """ Raised when a kink point computation runs past the limits of kink_limits. """
+
+
+class DeadlineExceeded(KinkLimitExceeded):
+    pass
+
+
+class KinkBudgetExceeded(KinkLimitExceeded):
+    pass
+
+
+class KinkLimits:
+    """ Deadline, in seconds of time.monotonic(), and maximal number of kink points of the sweeps.
+    Either of them can be None for no limit. """
+
+    def __init__(self, deadline=None, max_kink_points=None):
+        self.deadline = deadline
+        self.max_kink_points = max_kink_points
+
+    def check(self, n_kink_points):
+        """ Raises the KinkLimitExceeded if the sweep, which has found n_kink_points so far, is over a limit. """
+        if self.max_kink_points is not None and n_kink_points > self.max_kink_points:
+            raise KinkBudgetExceeded(f"more than {self.max_kink_points} kink points")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DeadlineExceeded(f"deadline passed {time.monotonic() - self.deadline:.3f} s ago")
+
+
+# limits checked by the sweeps, set by kink_limits, or None if there are none; a context variable, so the
+# limits of one thread (or asyncio task) do not apply to the sweeps of another
+active_limits = ContextVar("active_limits", default=None)
+
+
+@contextmanager
+def kink_limits(deadline=None, max_kink_points=None):
+    """ Context manager that limits the kink point sweeps in its block: every sweep checks, after each
+    point, that time.monotonic() has not passed the deadline and that it has not found more than
+    max_kink_points kink points, and raises the KinkLimitExceeded otherwise. The budget applies to each
+    sweep on its own, including the subproblems of the IncrementalKinkSets, and to the total of the
+    segments of a parallel sweep, so it bounds the size of the result and not the total work. Nested
+    blocks keep the stricter of the limits. The sweeps only change local state and the caches store
+    complete results only, so an interrupted computation leaves nothing behind. The limits only apply
+    to the sweeps in the current thread or context. """
+    if deadline is None and max_kink_points is None:
+        yield
+        return
+
+    outer = active_limits.get()
+    if outer is not None:
+        deadline = min((x for x in (deadline, outer.deadline) if x is not None), default=None)
+        max_kink_points = min((x for x in (max_kink_points, outer.max_kink_points) if x is not None), default=None)
+    limits = KinkLimits(deadline, max_kink_points)
+    token = active_limits.set(limits)
+    try:
+        yield limits
+    finally:
+        active_limits.reset(token)
+
+
+def assert_removed(state, new_point, removed):
+    for el in removed:
+        assert weakly_dominates(new_point, el), f"point doesn't dominate removed point: {new_point}, {el}"
+        assert el not in state, f"removed point is still in state: {state}, {el}"
+
+
+def get_kink_points_parallel(points, n_dim, workers, checked=False, limits=None):
+    """ Splits the sweep over the sorted points into segments, which depend only on the points
+    before them, and computes them in a process pool. The segments start where the last coordinate
+    decreases, so all the candidates a segment starts with were created higher than any of its
+    points, and the results are simply concatenated in the sweep order. If checked is True, the
+    segments are computed in the checked engine, and the KinkLimits are checked in every segment and on
+    the total number of kink points. """
+    points = np.asarray(points, dtype=float).reshape(-1, n_dim)
+    n_points = len(points)
+
+    n_segments = workers * SEGMENTS_PER_WORKER
+    bounds = [0]
+    for k in range(1, n_segments):
+        i = k * n_points // n_segments
+        while i < n_points and points[i, -1] == points[i - 1, -1]:
+            i += 1
+        if bounds[-1] < i < n_points:
+            bounds.append(i)
+    bounds.append(n_points)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(get_kink_points_segment, points[:end], start, end == n_points, checked, limits)
+                   for start, end in zip(bounds[:-1], bounds[1:])]
+        try:
+            # each segment only checks its own kink points, so the budget is checked on their total here
+            segments, n_kink_points = [], 0
+            for future in futures:
+                segments.append(future.result())
+                n_kink_points += len(segments[-1])
+                if limits is not None:
+                    limits.check(n_kink_points)
+        except KinkLimitExceeded:
+            # the segments that have not started would only run into the same limits
+            for future in futures:
+                future.cancel()
+            raise
+
+    return np.concatenate(segments)
+
+
+def get_kink_points_segment(points, start, finish, checked=False, limits=None):
+    """ Sweeps over points[start:] (an array sorted by the last coordinate), starting from the
+    kink points of the projection of points[:start], which are computed directly in one dimension
+    less. If finish is True, the remaining candidates are added at height 0. """
+    if limits is not None:
+        with kink_limits(limits.deadline, limits.max_kink_points):
+            return get_kink_points_segment(points, start, finish, checked)
+
+    d = points.shape[1]
+    prefix = list(map(tuple, points[:start, :-1].tolist()))
+    prefix_kink_points = get_kink_points(prefix, d - 1, engine="checked" if checked else "fast")
+    kink_candidates = IncrementalKinkSet.from_kink_points(d - 1, prefix, prefix_kink_points, checked)
+
+    kink_points = array('d')
+    sweep_kink_points(map(tuple, points[start:].tolist()), kink_candidates, kink_points, finish)
+    return np.frombuffer(kink_points).reshape(-1, d)
+
+
+def get_kink_points_rec(points, d, checked=False):
+    if checked:
         assert_sorted(points, d)
         assert_dimensionality(points, d)
-
     if d == 3:
-        return get_kink_points_rec_3d(points)
-
-    points_state = SortedList([], key=lambda x: -x[-1])
-
-    kp_cand = (0, ) * (d - 1)
-    kink_candidates = SortedList([kp_cand])
-    h = {kp_cand: math.inf}
-
-    kink_points = []
+        return get_kink_points_rec_3d(points, checked)
+
+    # coordinates of the kink points, stored contiguously
+    kink_points = array('d')
+
+    # the kink points of the (d-1)-dimensional state are kept up to date as the projected
+    # points are added to it, instead of being recomputed after every step
+    sweep_kink_points(points, IncrementalKinkSet(d - 1, checked=checked), kink_points)
+    return np.frombuffer(kink_points).reshape(-1, d)
+
+
+def sweep_kink_points(points, kink_candidates, kink_points, finish=True):
+    """ Adds the projections of the points to kink_candidates, an IncrementalKinkSet, and appends the
+    coordinates of the kink points that are found to kink_points. If finish is True, the remaining
+    candidates are added at height 0 at the end. The active kink_limits are checked after every point. """
+    d = kink_candidates.n_dim + 1
+    limits = active_limits.get()
+    for _, found, _ in sweep_steps(points, kink_candidates):
+        for kink_point in found:
+            kink_points.extend(kink_point)
+        if limits is not None:
+            limits.check(len(kink_points) // d)
+
+    if finish:
+        for point in kink_candidates:
+            kink_points.extend(point + (0, ))
+        if limits is not None:
+            limits.check(len(kink_points) // d)
+
+
+def sweep_steps(points, kink_candidates):
+    """ Generator that adds the projections of the points to kink_candidates, an IncrementalKinkSet, one
+    by one, and yields for every point the kink points found at its height and the new candidates. """
+    # a removed candidate is a kink point unless it was created at the same height, so instead of
+    # the heights of all the candidates, only the candidates created at the current height are kept
+    height, new_at_height = inf, set()
 
     for point in points:
-        removed = remove_dominated_nd(kink_candidates, point, "strict")
-        for rem_point in removed:
-            if strictly_dominates(point[:-1], rem_point) and h[rem_point] > point[-1]:
-                kink_points.append(rem_point + (point[-1],))
-
-        add_to_state(points_state, point[:-1], d)
+        if point[-1] < height:
+            height, new_at_height = point[-1], set()
 
-        new_kink_points = get_kink_points_rec(points_state[:], d - 1)
-        kink_candidates = SortedList(new_kink_points)
-        for nkp in new_kink_points:
-            if nkp not in h:
-                h[nkp] = point[-1]
-
-
-    for point in kink_candidates:
-        kink_points.append(point + (0, ))
+        removed, added = kink_candidates.insert(point[:-1])
+        found = [rem_point + (point[-1],) for rem_point in removed if rem_point not in new_at_height]
 
-    return kink_points
+        new_at_height.update(added)
+        yield point, found, added
 
 
-def get_kink_points_rec_3d(points):
+def get_kink_points_rec_3d(points, checked=False):
 
     points_state = SortedList([])
     kink_candidates = SortedList([(0, 0)])
-    h = {(0, 0): math.inf}
 
-    kink_points = []
+    # candidates created at the height of the current point, see get_kink_points_rec
+    height, new_at_height = inf, set()
+
+    kink_points = array('d')
+    limits = active_limits.get()
 
     for point in points:
+        if limits is not None:
+            limits.check(len(kink_points) // 3)
+        if point[-1] < height:
+            height, new_at_height = point[-1], set()
+
         # O(log(n) + #removed v)
-        removed = remove_dominated_3d(kink_candidates, point[:-1], "strict")
+        removed = remove_dominated_3d(kink_candidates, point[:-1], "strict", checked)
         # O(#removed)
         for rem_point in removed:
-            if strictly_dominates(point[:-1], rem_point) and h[rem_point] > point[-1]:
-                kink_points.append(rem_point + (point[-1],))
+            if strictly_dominates(point[:-1], rem_point) and rem_point not in new_at_height:
+                kink_points.extend(rem_point + (point[-1],))
 
         # O(log n + #removed p)
-        add_to_state(points_state, point[:-1], 3)
+        if not add_to_state(points_state, point[:-1], checked):
+            # the projection is dominated, so the state and its kink candidates do not change
+            continue
 
         # O(log n)
         idx = points_state.index(point[:-1])
@@ -108,50 +432,54 @@ def get_kink_points_rec_3d(points):
 
         # O(log n)
         for p in [p1, p2]:
-            if p not in h:
-                h[p] = point[-1]
-                add_to_state(kink_candidates, p, 3)
+            if p not in kink_candidates:
+                new_at_height.add(p)
+                add_to_state(kink_candidates, p, checked)
 
     # O(n)
     for point in kink_candidates:
-        kink_points.append(point + (0, ))
+        kink_points.extend(point + (0, ))
+    if limits is not None:
+        limits.check(len(kink_points) // 3)
 
-    return kink_points
+    return np.frombuffer(kink_points).reshape(-1, 3)
 
 
 
-def add_to_state(state, new_point, d):
-    """ Adds new_point to state, while keeping the state a list of non-dominated points,
-    sorted by the first dimension.
+def add_to_state(state, new_point, checked=False):
+    """ Adds new_point to state, while keeping the state a set of non-dominated points: either a
+    DominanceIndex, or a 2D staircase, a SortedList sorted by the first dimension.
     If new_point is dominated by any point in state, it is not added.
     All the points dominated by the new_point are removed.
+    Returns True if new_point was added, and False if the state did not change.
     """
-    if d == 3:
-        remove_dominated_3d(state, new_point, "weak")
+    if isinstance(state, DominanceIndex):
+        remove_dominated_nd(state, new_point, "weak", checked)
+        dominated = state_dominates_point(state, new_point)
     else:
-        remove_dominated_nd(state, new_point, "weak")
+        remove_dominated_3d(state, new_point, "weak", checked)
+        dominated = staircase_dominates_point(state, new_point)
 
-    if not state_dominates_point(state, new_point):
-        state.add(new_point)
+    if dominated:
+        return False
+    state.add(new_point)
+    return True
 
 
-def remove_dominated_nd(state, new_point, domination):
-    """ Removes all the points in state that are dominated by new_point. """
+def remove_dominated_nd(state, new_point, domination, checked=False):
+    """ Removes all the points in state, a DominanceIndex, that are dominated by new_point. """
     assert domination in ["strict", "weak"]
-
-    removed = []
-    for point in state:
-        if (strictly_dominates(new_point, point) or
-                (domination == "weak" and weakly_dominates(new_point, point))):
-            removed.append(point)
-
+    removed = state.dominated_points(new_point, domination)
     for point in removed:
         state.remove(point)
 
+    if checked:
+        assert_removed(state, new_point, removed)
+
     return removed
 
 
-def remove_dominated_3d(state, new_point, domination):
+def remove_dominated_3d(state, new_point, domination, checked=False):
     """ Removes all the points in state that are dominated by new_point. """
     assert domination in ["strict", "weak"]
     left, right = get_dominated_points_bisect(state, new_point, domination)
@@ -159,15 +487,170 @@ def remove_dominated_3d(state, new_point, domination):
     removed = state[left:right]
     del state[left:right]
 
-    if MAKE_EXPENSIVE_ASSERTS:
-        for el in removed:
-            assert weakly_dominates(new_point, el), f"point doesn't dominate removed point: {new_point}, {el}"
-            assert el not in state, f"removed point is still in state: {state}, {el}"
+    if checked:
+        assert_removed(state, new_point, removed)
 
     return removed
 
 
 
+class IncrementalKinkSet:
+    """ Kink points of a set of non-dominated points, which are updated when a point is inserted
+    into or removed from the set, instead of being recomputed from scratch.
+
+    The kink points are the minimal points that are not strictly dominated by any point of the set.
+    When a point is inserted, the kink points it strictly dominates are replaced by their copies with
+    one coordinate raised to the coordinate of the new point, and only the copies that are not
+    dominated by another kink point are kept. When a point is removed, the kink points inside its
+    box are computed from the neighbouring points clipped to the removed point, and the old kink
+    points that dominate one of them are dropped. In both cases the only old kink points that have
+    to be checked share a coordinate with the inserted or removed point, so they are looked up in
+    the DominanceIndex of the kink points by coordinate values. The points are expected to have positive
+    coordinates, as in get_kink_points. If checked is True, the set runs the checks of the "checked" engine.
+    """
+
+    def __init__(self, n_dim, points=(), cache_size=SUBPROBLEM_CACHE_SIZE, checked=False):
+        self.n_dim = n_dim
+        self.checked = checked
+        self.points = DominanceIndex(n_dim)
+
+        # kink points of the clipped fronts computed in remove, least recently used first
+        self.cache_size = cache_size
+        self.box_cache = OrderedDict()
+
+        self.kink_points = DominanceIndex(n_dim, [(0, ) * n_dim])
+
+        for point in points:
+            self.insert(point)
+
+    @classmethod
+    def from_kink_points(cls, n_dim, points, kink_points, checked=False):
+        """ Returns the set of the points, given their already computed kink points. """
+        kink_set = cls(n_dim, checked=checked)
+        kink_set.points = DominanceIndex(n_dim, remove_dominated_points(list(set(points))))
+        kink_set.kink_points = DominanceIndex(n_dim, map(tuple, np.asarray(kink_points).tolist()))
+        return kink_set
+
+    def __len__(self):
+        return len(self.kink_points)
+
+    def __iter__(self):
+        return iter(self.kink_points)
+
+    def insert(self, point):
+        """ Adds the point to the set and returns the lists of removed and added kink points.
+        If the point is weakly dominated by a point in the set, nothing changes. Otherwise, the points of
+        the set that it weakly dominates are dropped. The dropped points are not kept anywhere, so they do
+        not come back when the point dominating them is removed; the set then holds fewer points than the
+        archive they were inserted from. """
+        point = tuple(point)
+        if not add_to_state(self.points, point, self.checked):
+            return [], []
+
+        removed = remove_dominated_nd(self.kink_points, point, "strict", self.checked)
+
+        added = []
+        for j in range(self.n_dim):
+            # a candidate can only be dominated by another candidate raised in the same coordinate,
+            # or by an old kink point with the same value of that coordinate, so they are compared without it
+            candidates = [kp[:j] + kp[j + 1:] for kp in removed]
+            same_value = [kp[:j] + kp[j + 1:] for kp in self.kink_points.points_with_value(j, point[j])]
+            added.extend(p[:j] + (point[j], ) + p[j:] for p in minimal_points(candidates, same_value))
+
+        for kink_point in added:
+            self.kink_points.add(kink_point)
+
+        return removed, added
+
+    def remove(self, point):
+        """ Removes the point from the set and returns the lists of removed and added kink points.
+        Raises ValueError if the point is not in the set. The set only changes once the kink points
+        of the box are computed, so it stays intact if that is interrupted (see kink_limits). """
+        point = tuple(point)
+        if point not in self.points:
+            raise ValueError(f"{point} is not in the set")
+
+        # the new kink points lie inside the box of the removed point, where the remaining points act as
+        # if they were clipped to it; the clipped points that are not dominated define kink points on the
+        # faces of the box, so they share a coordinate below the removed point with an old kink point there
+        touched = set()
+        for j in range(self.n_dim):
+            touched.update(self.kink_points.points_with_value(j, point[j]))
+        neighbours = set()
+        for kink_point in touched:
+            for i in range(self.n_dim):
+                if kink_point[i] < point[i]:
+                    neighbours.update(self.points.points_with_value(i, kink_point[i]))
+        neighbours.discard(point)
+        clipped = frozenset(tuple(min(x, y) for x, y in zip(p, point)) for p in neighbours)
+        added = [kp for kp in map(tuple, self._box_kink_points(clipped).tolist()) if strictly_dominates(point, kp)]
+        self.points.remove(point)
+
+        removed = set()
+        for j in range(self.n_dim):
+            for kink_point in self.kink_points.points_with_value(j, point[j]):
+                if any(weakly_dominates(kink_point, kp) for kp in added):
+                    removed.add(kink_point)
+
+        for kink_point in removed:
+            self.kink_points.remove(kink_point)
+        for kink_point in added:
+            self.kink_points.add(kink_point)
+
+        return list(removed), added
+
+    def _box_kink_points(self, clipped):
+        """ Returns the kink points of the clipped front. The same clipped front is seen again
+        whenever a point is removed from an unchanged neighbourhood, e.g. when an optimizer keeps
+        inserting and removing the same candidate, so the recent results are reused. """
+        if clipped in self.box_cache:
+            self.box_cache.move_to_end(clipped)
+            return self.box_cache[clipped]
+
+        kink_points = get_kink_points(remove_dominated_points(list(clipped)), self.n_dim,
+                                      engine="checked" if self.checked else "fast")
+        if self.cache_size > 0:
+            self.box_cache[clipped] = kink_points
+            if len(self.box_cache) > self.cache_size:
+                self.box_cache.popitem(last=False)
+        return kink_points
+
+
+class KinkPointCache(LRUCache):
+    """ Kink points of recently seen fronts, keyed by the content hash of the front and its dimension,
+    so repeated distance queries against the same front do not recompute them. The least recently used
+    fronts are evicted when there are more than max_entries of them or when their kink points take more
+    than max_bytes. The cached arrays are read-only, since they are shared between the callers. """
+
+    def __init__(self, max_entries=KINK_CACHE_ENTRIES, max_bytes=KINK_CACHE_BYTES):
+        super().__init__(max_entries, max_bytes)
+
+    def get_kink_points(self, pareto_front, dim):
+        """ Returns the kink points of the front, computing and storing them if they are not cached. """
+        key = (front_hash(pareto_front, dim), dim)
+        kink_points = self.lookup(key)
+        if kink_points is not None:
+            return kink_points
+
+        kink_points = get_kink_points(pareto_front, dim)
+        kink_points.setflags(write=False)
+        self.put(key, kink_points)
+        return kink_points
+
+
+kink_point_cache = KinkPointCache()
+
+
+def cached_kink_points(pareto_front, dim, cache=None):
+    """ Returns the kink points of the front from the given cache, from the module-wide kink_point_cache
+    if cache is None, or computes them if cache is False. """
+    if cache is False:
+        return get_kink_points(pareto_front, dim)
+    if cache is None:
+        cache = kink_point_cache
+    return cache.get_kink_points(pareto_front, dim)
+
+
 def main():
     points = [(1.0, 0.9, 0.7), (0.4, 1.0, 0.5), (0.8, 1.0, 0.2), (0.6, 1.0, 0.4), (0.5, 0.9, 1.0), (1.0, 0.7, 1.0)]
     kp = get_kink_points(points, 3)
@@ -4,15 +4,24 @@ import matplotlib.pyplot as plt
 import matplotlib as mpl
 import numpy as np
 
+from benchmark import load_summary
+
+
+def summary_times(summary, dim, front, m):
+    """ Returns the time statistics of one configuration from the benchmark summary. """
+    df = summary[(summary["dim"] == dim) & (summary["front_type"] == front) & (summary["m"] == m)]
+    return df.sort_values("front_size").reset_index(drop=True)
+
+
 def plot_time_archive_size():
     m = 1
     plt.figure(figsize=(5.5,4))
     cmap = mpl.colormaps["Paired"]
     formats = ["s-", "d-"]
+    summary = load_summary()
     for i, dim in enumerate(range(3, 7)):
         for j, front in enumerate(["linear", "spherical"]):
-            df = pd.read_csv(f"../performance_results/results_dim={dim}_front={front}_m={m}.csv")
-            df = df.groupby("front_size")["time"].agg(["mean", "min", "max"]).reset_index()
+            df = summary_times(summary, dim, front, m)
             plt.plot(df["front_size"], df["mean"], formats[j],
                      label=f"{front} {dim}D", color=cmap(2 * i + j))
 
@@ -28,11 +37,11 @@ def plot_time_archive_size():
     plt.show()
 
 def prepare_pgfp_plot():
+    summary = load_summary()
     for dim in range(3, 7):
         for m in [1, 10, 100]:
             for front in ["linear", "spherical", "worst_case"]:
-                df = pd.read_csv(f"../performance_results/results_dim={dim}_front={front}_m={m}.csv")
-                df = df.groupby("front_size")["time"].agg(["mean"]).reset_index()
+                df = summary_times(summary, dim, front, m)[["front_size", "mean"]]
                 df.to_csv(f"../csv/time_{front}_{dim}D_{m}.csv", index=False)
 
 
@@ -63,14 +72,14 @@ def plot_time_multiplier():
 def plot_time_different_m():
     cmap = mpl.colormaps["Paired"]
     colors = [['#bdd7e7','#6baed6','#3182bd','#08519c'], ['#fcae91','#fb6a4a','#de2d26','#a50f15']]
+    summary = load_summary()
 
     for i, dim in enumerate(range(3, 6)):
         plt.figure(figsize=(5.5, 4))
 
         for j, front in enumerate(["linear", "spherical"]):
             for k, m in enumerate([1, 10, 100]):
-                df = pd.read_csv(f"../performance_results/results_dim={dim}_front={front}_m={m}.csv")
-                df = df.groupby("front_size")["time"].agg(["mean", "min", "max"]).reset_index()
+                df = summary_times(summary, dim, front, m)
 
                 plt.plot(df["front_size"], df["mean"],
                          label=f"{front} m={m}", color=colors[j][k])
@@ -1,14 +1,24 @@
 import math
 import numpy as np
+from sortedcontainers import SortedList
 
-from utils import weakly_dominates, state_dominates_point
+from utils import (staircase_dominates_point, get_dominated_points_bisect, dominated_mask,
+                   dominance_counts)
+
+inf = float('inf')
+
+# number of points compared at once in dominated_in_sorted_order for four or more dimensions
+DOMINANCE_BLOCK_SIZE = 256
+
+# number of points in the chunks yielded by epsilon_net_chunks
+NET_CHUNK_SIZE = 2 ** 16
 
 
 def get_non_dominated_points(n_points, n_dim=3, mode='spherical', distance=1):
     """ Returns a list of non-dominated points:
      - n_points: number of points
      - n_dim: number of dimensions
-     - mode: 'spherical', 'linear' or 'random'
+     - mode: 'spherical', 'linear', 'random', 'worst_case' or 'adversarial' (see adversarial_front)
 
      in case of 'random' mode, the n_points parameter refers to the number of
      all points sampled, and not to the number of non-dominated points that are returned.
@@ -27,6 +37,9 @@ def get_non_dominated_points(n_points, n_dim=3, mode='spherical', distance=1):
         front = linear_front(distance, n_points, n_dim - 1)
         last_dimension = np.random.random(n_points)
         return [tuple(list(v) + [w]) for v, w in zip(front, last_dimension)]
+    elif mode == "adversarial":
+        front = adversarial_front(distance, n_points, n_dim)
+        return [tuple(v) for v in front]
     else:
         raise ValueError("Invalid mode")
 
@@ -42,6 +55,29 @@ def linear_front(distance, num_points, dim):
     return vectors
 
 
+def adversarial_front(distance, num_points, dim):
+    """ Returns the front with the largest known number of kink points. In 4D it is the construction of the
+    lower bound Omega(n^2) from the thesis, with n = 2m points
+        (i + 1, m - i, n - i, n - i) and (n - i, n - i, i + 1, m - i) for i = 0, ..., m - 1.
+    In D dimensions the last 2k coordinates, k = D // 2, are split into k pairs, and the points are split
+    into k groups of m points. The points of group g form a 2D staircase (i + 1, m - i) in the pair g, and
+    have the value n - i in all the other coordinates, which makes the number of kink points grow as
+    n^k. The coordinates are scaled so that the largest one equals distance. """
+    k = max(dim // 2, 1)
+    m = math.ceil(num_points / k)
+    n = k * m
+
+    points = np.empty((n, dim))
+    for g in range(k):
+        i = np.arange(m)
+        group = points[g * m:(g + 1) * m]
+        group[:] = (n - i)[:, np.newaxis]
+        group[:, dim - 2 * (k - g)] = i + 1
+        if dim > 1:
+            group[:, dim - 2 * (k - g) + 1] = m - i
+    return points[:num_points] * distance / n
+
+
 def spherical_front(distance, num_points, dim):
     """ Returns a list of non-dominated points on the n-D sphere """
     vectors = np.random.normal(0, 1, (num_points, dim))
@@ -51,49 +87,105 @@ def spherical_front(distance, num_points, dim):
     return vectors
 
 def epsilon_net_from_square(radius, epsilon, dim):
+    """ Returns the whole epsilon net of epsilon_net_chunks as one array. """
+    return np.vstack(list(epsilon_net_chunks(radius, epsilon, dim)))
+
+
+def square_grid(radius, epsilon, dim):
+    """ Returns the coordinates of the grid on the faces of the cube [0, radius]^dim that is projected to
+    the sphere by epsilon_net_chunks. """
     h = 2 * epsilon / np.power(dim - 1, 0.5)
     n = math.ceil(radius / h) + 1
-    lspace = np.linspace(0, radius, n)
-    grid = np.meshgrid(*([lspace] * (dim - 1)))
-    points = np.vstack([g.ravel() for g in grid]).T
-    l = len(points)
+    return np.linspace(0, radius, n)
+
 
-    square_pts = []
-    for d in range(dim):
-        stacked = np.column_stack([points[:, :d], [radius] * l, points[:, d:]])
-        square_pts.append(stacked)
+def epsilon_net_size(radius, epsilon, dim):
+    """ Returns the number of points of the net of epsilon_net_chunks, n^dim - (n - 1)^dim for a grid with
+    n values per coordinate. """
+    n = len(square_grid(radius, epsilon, dim))
+    return n ** dim - (n - 1) ** dim
 
-    square_pts = np.vstack(square_pts)
 
-    # print(square_pts)
-    norms = np.linalg.norm(square_pts, axis=1, keepdims=True)
+def epsilon_net_chunks(radius, epsilon, dim, chunk_size=NET_CHUNK_SIZE):
+    """ Generator of an epsilon net of the positive part of the sphere of the given radius in chunks of
+    chunk_size points (the last one can be smaller). The net is a grid on the outer faces of the cube
+    [0, radius]^dim, projected to the sphere. A point on the face x_d = radius is only generated on that
+    face if all its coordinates before d are smaller than radius, so the points on the edges shared by
+    several faces are generated once, without keeping the whole net in memory to remove duplicates. """
+    return grid_net_chunks(len(square_grid(radius, epsilon, dim)), radius, dim, chunk_size)
+
+
+def grid_net_chunks(n, radius, dim, chunk_size=NET_CHUNK_SIZE):
+    """ Generator of the net of epsilon_net_chunks for a grid with n values per coordinate. """
+    lspace = np.linspace(0, radius, n)
 
-    # Normalize: divide each point by its norm
-    circle_pts = square_pts / norms * radius
-    circle_pts = np.unique(circle_pts, axis=0)
+    # the faces are enumerated one after the other, face d has (n - 1)^d * n^(dim - 1 - d) points
+    shapes = [(n - 1, ) * d + (n, ) * (dim - 1 - d) for d in range(dim)]
+    offsets = [0]
+    for shape in shapes:
+        offsets.append(offsets[-1] + math.prod(shape))
 
-    return circle_pts
+    for start in range(0, offsets[-1], chunk_size):
+        stop = min(start + chunk_size, offsets[-1])
+        parts = []
+        for d, shape in enumerate(shapes):
+            first, last = max(start, offsets[d]), min(stop, offsets[d + 1])
+            if first >= last:
+                continue
+            indices = np.unravel_index(np.arange(first - offsets[d], last - offsets[d]), shape)
+            columns = [lspace[i] for i in indices]
+            columns.insert(d, np.full(last - first, float(radius)))
+            parts.append(np.column_stack(columns))
 
+        square_pts = np.vstack(parts)
+        yield square_pts / np.linalg.norm(square_pts, axis=1, keepdims=True) * radius
 
 
 def epsilon_net(radius, epsilon, dim):
     """ Returns a list of non-dominated points on the n-D sphere """
     h = (2 * epsilon) / (radius * np.power((dim - 1), 1 / 2)) # TODO: preveri...
     net = epsilon_net_rec(h, dim, np.pi / 2, np.array([[1.0]]))
-    return [[radius * p for p in point] for point in net]
+    return [[radius * p for p in point] for block in net for point in block]
 
 
 def epsilon_net_rec(h, dim, area, vectors):
-    """ Returns a list of non-dominated points on the n-D sphere """
+    """ Generator of the blocks of non-dominated points on the n-D unit sphere, which are yielded one by
+    one instead of being stacked on every level of the recursion. """
     phi_space = np.linspace(0, np.pi / 2, math.ceil(area / h + 1))
 
     if dim == 2:
-        new_vectors = [get_new_vectors(vectors, phi) for phi in phi_space]
-        return np.vstack(new_vectors)
+        for phi in phi_space:
+            yield get_new_vectors(vectors, phi)
+        return
+
+    for phi in phi_space:
+        yield from epsilon_net_rec(h, dim - 1, np.cos(phi) * area, get_new_vectors(vectors, phi))
 
-    new_vectors = [epsilon_net_rec(h, dim - 1, np.cos(phi) * area, get_new_vectors(vectors, phi))
-                   for phi in phi_space]
-    return np.vstack(new_vectors)
+
+def epsilon_net_rec_size(h, dim, area=np.pi / 2):
+    """ Returns the number of points of epsilon_net_rec(h, dim, area, vectors) for a single vector, without
+    generating them. """
+    n_phi = math.ceil(area / h + 1)
+    if dim == 2:
+        return n_phi
+    return sum(epsilon_net_rec_size(h, dim - 1, np.cos(phi) * area) for phi in np.linspace(0, np.pi / 2, n_phi))
+
+
+def epsilon_net_rec_chunks(h, dim, chunk_size=NET_CHUNK_SIZE):
+    """ Generator of the points of the unit net of epsilon_net_rec in chunks of chunk_size points (the last
+    one can be smaller), so the net is never in memory as a whole. """
+    blocks, n_points = [], 0
+    for block in epsilon_net_rec(h, dim, np.pi / 2, np.array([[1.0]])):
+        blocks.append(block)
+        n_points += len(block)
+        if n_points >= chunk_size:
+            points = np.vstack(blocks)
+            for start in range(0, len(points) - chunk_size + 1, chunk_size):
+                yield points[start:start + chunk_size]
+            rest = points[len(points) - len(points) % chunk_size:]
+            blocks, n_points = [rest], len(rest)
+    if n_points > 0:
+        yield np.vstack(blocks)
 
 
 def get_new_vectors(vectors, phi):
@@ -105,26 +197,82 @@ def get_new_vectors(vectors, phi):
 
 
 def remove_dominated_points(points):
-    """ Removes dominated points from a list of points """
-    non_dominated_points = []
-    for p1 in points:
-        dominated = False
-        for p2 in points:
-            if weakly_dominates(p2, p1) and not np.array_equal(p1, p2):
-                dominated = True
-                break
-        if not dominated:
-            non_dominated_points.append(tuple(p1))
-    return non_dominated_points
+    """ Removes dominated points from a list of points.
+    A point is removed if another, different point weakly dominates it, so all the copies of
+    a non-dominated point are kept. The points are returned as tuples, in the input order. """
+    if len(points) == 0:
+        return []
+    unique_points, inverse = np.unique(np.asarray(points, dtype=float), axis=0, return_inverse=True)
+    # a point can only be dominated by points that come before it in descending lexicographic order
+    dominated = dominated_in_sorted_order(unique_points[::-1])[::-1]
+    return [tuple(p) for p, i in zip(points, inverse.ravel()) if not dominated[i]]
+
+
+def dominated_in_sorted_order(points):
+    """ Returns a boolean mask of the points that are weakly dominated by another point, for distinct
+    points sorted in descending lexicographic order. """
+    n_points, dim = points.shape
+    if dim == 2:
+        # dominated iff some earlier point has at least as large second coordinate
+        max_before = np.maximum.accumulate(np.concatenate([[-inf], points[:-1, 1]]))
+        return max_before >= points[:, 1]
+
+    dominated = np.zeros(n_points, dtype=bool)
+    if dim == 3:
+        # sweep keeping the staircase of the last two coordinates of the earlier points
+        staircase = SortedList([])
+        for i, point in enumerate(points):
+            yz = (point[1], point[2])
+            if staircase_dominates_point(staircase, yz):
+                dominated[i] = True
+                continue
+            left, right = get_dominated_points_bisect(staircase, yz, "weak")
+            del staircase[left:right]
+            staircase.add(yz)
+        return dominated
+
+    # compare blocks of points with the non-dominated earlier points and with each other
+    front = np.empty((0, dim))
+    for start in range(0, n_points, DOMINANCE_BLOCK_SIZE):
+        block = points[start:start + DOMINANCE_BLOCK_SIZE]
+        by_front = dominated_mask(front, block)
+        in_block = (block[np.newaxis, :, :] >= block[:, np.newaxis, :]).all(axis=2)
+        np.fill_diagonal(in_block, False)
+        block_dominated = by_front | in_block.any(axis=1)
+
+        dominated[start:start + len(block)] = block_dominated
+        front = np.vstack([front, block[~block_dominated]])
+    return dominated
 
 
 def sample_random_dominated_point(front, dim):
-    """ Randomly samples point until it is dominated by at least one point from the front """
-    random_point = np.random.random(dim)
-    while not state_dominates_point(front, random_point):
-        random_point = np.random.random(dim)
-    return tuple(random_point)
+    """ Returns a uniformly random point of [0, 1]^dim that is dominated by at least one point from the front """
+    return tuple(sample_dominated_points(front, dim, 1)[0])
+
+
+def sample_dominated_points(front, dim, m):
+    """ Returns an (m, dim) array of independent, uniformly random points of [0, 1]^dim that are dominated by
+    at least one point from the front. Instead of rejecting the points of [0, 1]^dim that are not dominated,
+    the points are drawn directly from the union of the boxes [0, p] of the front points p (clipped to the
+    unit cube): a box is picked with probability proportional to its volume, a point is drawn uniformly
+    from it and accepted with probability 1 / (number of boxes containing it), which makes the accepted
+    points uniform on the union. Raises ValueError if the union has no volume. """
+    boxes = np.clip(np.asarray(front, dtype=float).reshape(-1, dim), 0, 1)
+    volumes = np.prod(boxes, axis=1)
+    if not volumes.sum() > 0:
+        raise ValueError("the points dominated by the front have zero volume in the unit cube")
+    probabilities = volumes / volumes.sum()
 
+    samples = []
+    n_samples = 0
+    while n_samples < m:
+        # draw a few more than the expected number needed, as some of them are rejected
+        n_draws = 2 * (m - n_samples) + 16
+        points = boxes[np.random.choice(len(boxes), n_draws, p=probabilities)] * np.random.random((n_draws, dim))
+        accepted = points[np.random.random(n_draws) * dominance_counts(boxes, points) < 1]
+        samples.append(accepted[:m - n_samples])
+        n_samples += len(samples[-1])
+    return np.vstack(samples)
 
 if __name__ == "__main__":
     epsilon_net_from_square(1, 0.5, 2)
@@ -0,0 +1,133 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import main
+
+
+class SweepProfile:
+    """ Statistics of the kink point sweeps, collected while profiling is active. The per-level entries
+    are keyed by the dimension of the sweep; the 3D candidates are counted as the returned kink points.
+    If a callback is given, it is called with every event as a dict as soon as it is recorded.
+    large_slice_deletions is a heuristic, not a measurement: it counts the removals of at least an eighth
+    (but not all) of a SortedList, which sortedcontainers currently implements by rebuilding the list. """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.time_ns = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.subproblem_sizes = defaultdict(list)
+        self.kink_points = defaultdict(int)
+        self.candidates = defaultdict(int)
+        self.candidate_time_ns = defaultdict(int)
+        self.removed_3d = []
+        self.removed_nd = []
+        self.large_slice_deletions = 0
+        self.max_sorted_list_size = 0
+        self.max_dominance_index_size = 0
+
+    def _emit(self, event, **data):
+        if self.callback is not None:
+            self.callback(dict(event=event, **data))
+
+    def record_subproblem(self, dim, size, time_ns, n_kink_points):
+        self.time_ns[dim] += time_ns
+        self.calls[dim] += 1
+        self.subproblem_sizes[dim].append(size)
+        self.kink_points[dim] += n_kink_points
+        if dim == 3:
+            self.candidates[dim] += n_kink_points
+        self._emit("subproblem", dim=dim, size=size, time_ns=time_ns, kink_points=n_kink_points)
+
+    def record_candidates(self, dim, n_added, time_ns):
+        self.candidates[dim] += n_added
+        self.candidate_time_ns[dim] += time_ns
+        self._emit("candidates", dim=dim, added=n_added, time_ns=time_ns)
+
+    def record_removed_3d(self, n_removed, size):
+        # a removal of all the points clears the list instead of rebuilding it
+        large = 0 < n_removed < size and size <= 8 * n_removed
+        self.removed_3d.append(n_removed)
+        self.large_slice_deletions += large
+        self.max_sorted_list_size = max(self.max_sorted_list_size, size)
+        self._emit("remove_dominated_3d", removed=n_removed, large_slice=large, size=size)
+
+    def record_removed_nd(self, n_removed, size):
+        self.removed_nd.append(n_removed)
+        self.max_dominance_index_size = max(self.max_dominance_index_size, size)
+        self._emit("remove_dominated_nd", removed=n_removed, size=size)
+
+    def report(self):
+        """ Returns the statistics as a dict of plain values, with one entry per dimension. """
+        dims = sorted(self.calls)
+        return {
+            "levels": {d: {"calls": self.calls[d], "time_ns": self.time_ns[d],
+                           "subproblem_sizes": list(self.subproblem_sizes[d]),
+                           "kink_points": self.kink_points[d], "candidates": self.candidates[d],
+                           "candidate_time_ns": self.candidate_time_ns[d]}
+                       for d in dims},
+            "removed_3d": list(self.removed_3d),
+            "removed_nd": list(self.removed_nd),
+            "large_slice_deletions": self.large_slice_deletions,
+            "max_sorted_list_size": self.max_sorted_list_size,
+            "max_dominance_index_size": self.max_dominance_index_size,
+        }
+
+
+@contextmanager
+def profiling(callback=None):
+    """ Context manager that records the kink point computations in its block into the SweepProfile it
+    yields. The functions of main are replaced by instrumented versions only inside the block, so the
+    sweep has no overhead when it is not profiled. Only the sweeps in the current process are recorded,
+    but the functions are replaced for the whole process, so the sweeps that other threads run during the
+    block are recorded as well; profile in one thread at a time. """
+    profile = SweepProfile(callback)
+
+    get_kink_points_rec = main.get_kink_points_rec
+    remove_dominated_3d = main.remove_dominated_3d
+    remove_dominated_nd = main.remove_dominated_nd
+    insert = main.IncrementalKinkSet.insert
+
+    def profiled_get_kink_points_rec(points, d, checked=False):
+        t0 = time.perf_counter_ns()
+        kink_points = get_kink_points_rec(points, d, checked)
+        profile.record_subproblem(d, len(points), time.perf_counter_ns() - t0, len(kink_points))
+        return kink_points
+
+    def profiled_remove_dominated_3d(state, new_point, domination, checked=False):
+        size = len(state)
+        removed = remove_dominated_3d(state, new_point, domination, checked)
+        profile.record_removed_3d(len(removed), size)
+        return removed
+
+    def profiled_remove_dominated_nd(state, new_point, domination, checked=False):
+        size = len(state)
+        removed = remove_dominated_nd(state, new_point, domination, checked)
+        profile.record_removed_nd(len(removed), size)
+        return removed
+
+    def profiled_insert(kink_set, point):
+        t0 = time.perf_counter_ns()
+        removed, added = insert(kink_set, point)
+        profile.record_candidates(kink_set.n_dim + 1, len(added), time.perf_counter_ns() - t0)
+        return removed, added
+
+    main.get_kink_points_rec = profiled_get_kink_points_rec
+    main.remove_dominated_3d = profiled_remove_dominated_3d
+    main.remove_dominated_nd = profiled_remove_dominated_nd
+    main.IncrementalKinkSet.insert = profiled_insert
+    try:
+        yield profile
+    finally:
+        main.get_kink_points_rec = get_kink_points_rec
+        main.remove_dominated_3d = remove_dominated_3d
+        main.remove_dominated_nd = remove_dominated_nd
+        main.IncrementalKinkSet.insert = insert
+
+
+def profile_kink_points(points, n_dim, callback=None):
+    """ Computes the kink points of the points in one process while profiling the sweep.
+    Returns the kink points and the report of the SweepProfile. """
+    with profiling(callback) as profile:
+        kink_points = main.get_kink_points(points, n_dim)
+    return kink_points, profile.report()
@@ -1,8 +1,15 @@
 from point_sampling import (remove_dominated_points, get_non_dominated_points,
-                            sample_random_dominated_point, epsilon_net, epsilon_net_from_square)
+                            sample_random_dominated_point)
+import os
+import itertools
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from main import get_kink_points, dist_to_kink_points
-from utils import state_dominates_point
+from utils import dominated_mask
+from epsilon_net_cache import net_cache
+
+# number of processes checking the chunks of the epsilon nets
+WORKERS = os.cpu_count()
 
 
 def test_algorithm(n_points=100, n_tests=1, round_decimals=1):
@@ -56,20 +63,19 @@ def test_one_point(points, test_point, dim):
 
 
 def sample_epsilon_net_until_found(points, test_point, max_distance, dim,
-                                   start_net_epsilon=1, max_sample_size=1_000_00, should_find=True):
-    test_point = np.array(test_point)
+                                   start_net_epsilon=1, max_sample_size=1_000_00, should_find=True,
+                                   workers=WORKERS):
     net_size = 0
     while net_size < max_sample_size:
-        test_points = epsilon_net(max_distance, start_net_epsilon, dim)
-        net_size = len(test_points)
-
-        for point in test_points:
-            if not state_dominates_point(points, test_point + point):
-                if should_find:
-                    print(f" \033[92myes\033[0m   | {net_size:10d} |")
-                else:
-                    print(f" \033[91myes\033[0m   | {net_size:10d} |")
-                return True
+        net = net_cache.recursive_net(max_distance, start_net_epsilon, dim)
+        net_size = len(net)
+
+        if net_has_undominated_point(points, test_point, net.chunks(), workers):
+            if should_find:
+                print(f" \033[92myes\033[0m   | {net_size:10d} |")
+            else:
+                print(f" \033[91myes\033[0m   | {net_size:10d} |")
+            return True
         start_net_epsilon /= 2
 
     if should_find:
@@ -79,19 +85,17 @@ def sample_epsilon_net_until_found(points, test_point, max_distance, dim,
 
     return False
 
-def sample_epsilon_net_direct(points, test_point, delta, distance, dim, should_find=True):
-    test_point = np.array(test_point)
+def sample_epsilon_net_direct(points, test_point, delta, distance, dim, should_find=True, workers=WORKERS):
+    # the unit net of the relative epsilon is reused for all the distances and scaled chunk by chunk
+    net = net_cache.square_net(distance, delta / np.sqrt(dim), dim)
+    net_size = len(net)
 
-    test_points = epsilon_net_from_square(distance, epsilon=delta/np.sqrt(dim), dim=dim)
-    net_size = len(test_points)
-
-    for point in test_points:
-        if not state_dominates_point(points, test_point + point):
-            if should_find:
-                print(f" \033[92myes\033[0m   | {net_size:10d} |")
-            else:
-                print(f" \033[91myes\033[0m   | {net_size:10d} |")
-            return True
+    if net_has_undominated_point(points, test_point, net.chunks(), workers):
+        if should_find:
+            print(f" \033[92myes\033[0m   | {net_size:10d} |")
+        else:
+            print(f" \033[91myes\033[0m   | {net_size:10d} |")
+        return True
 
     if should_find:
         print(f" \033[91mno\033[0m    | {net_size:10d} |")
@@ -101,6 +105,43 @@ def sample_epsilon_net_direct(points, test_point, delta, distance, dim, should_f
     return False
 
 
+def net_has_undominated_point(points, test_point, net_chunks, workers=WORKERS):
+    """ Returns True if any point of the net, shifted by the test point, is not weakly dominated by the
+    points. Each chunk of the net is checked at once with dominated_mask. With workers > 1 and a net of
+    several chunks, the chunks are checked in a process pool, with at most two chunks per worker in flight.
+    The search stops at the first chunk with such a point. """
+    front = np.asarray(points, dtype=float)
+    test_point = np.asarray(test_point, dtype=float)
+    # starting the pool takes longer than checking a single chunk
+    net_chunks = iter(net_chunks)
+    first = list(itertools.islice(net_chunks, 2))
+    net_chunks = itertools.chain(first, net_chunks)
+    if workers is None or workers <= 1 or len(first) < 2:
+        return any(chunk_has_undominated_point(front, test_point, chunk) for chunk in net_chunks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in net_chunks:
+            pending.add(executor.submit(chunk_has_undominated_point, front, test_point, chunk))
+            while len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if any(future.result() for future in done):
+                    for future in pending:
+                        future.cancel()
+                    return True
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(future.result() for future in done):
+                for future in pending:
+                    future.cancel()
+                return True
+    return False
+
+
+def chunk_has_undominated_point(front, test_point, chunk):
+    return not dominated_mask(front, test_point + chunk).all()
+
 
 
 if __name__ == '__main__':
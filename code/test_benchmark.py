@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+
+from benchmark import run_benchmarks, read_runs, results_path, load_summary
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            summary = run_benchmarks([3, 4], ["linear"], [1, 10], n_repeats=2, n_warmup=1, time_limit=0.02,
+                                     workers=2, results_dir=directory)
+            self.assertEqual(sorted(set(zip(summary["dim"], summary["m"]))), [(3, 1), (3, 10), (4, 1), (4, 10)])
+            self.assertTrue((summary["n_repeats"] == 2).all())
+            self.assertTrue((summary["min"] <= summary["median"]).all())
+            self.assertEqual(len(load_summary(directory)), len(summary))
+            self.assertTrue((summary["kink_peak_bytes"] > 0).all())
+            self.assertTrue((summary.loc[summary["dim"] == 3, "max_sorted_list_size"] > 0).all())
+            self.assertTrue((summary.loc[summary["dim"] == 4, "max_dominance_index_size"] > 0).all())
+
+            # cut the last run of one configuration in half, as if the sweep was interrupted
+            path = results_path(directory, 4, "linear", 10)
+            runs = read_runs(path)
+            with open(path) as f:
+                lines = f.readlines()
+            with open(path, "w") as f:
+                f.writelines(lines[:-1])
+                f.write(lines[-1][:10])
+
+            run_benchmarks([4], ["linear"], [10], n_repeats=2, n_warmup=1, time_limit=0.02, workers=1,
+                           results_dir=directory)
+            resumed = read_runs(path)
+            self.assertEqual(resumed[:len(runs) - 1], runs[:-1])
+            # the lost run is repeated on the same front
+            keys = ["front_size", "repeat", "warmup", "n_kink_points"]
+            self.assertEqual([resumed[len(runs) - 1][k] for k in keys], [runs[-1][k] for k in keys])
+
+
+if __name__ == '__main__':
+    unittest.main()
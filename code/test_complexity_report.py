@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from benchmark import results_path
+from complexity_report import complexity_report, ComplexityRegression, BASELINE_FILE
+
+
+def write_runs(directory, dim, front_type, exponent, n_repeats=5):
+    """ Writes runs whose times grow as front_size^exponent, with multiplicative noise. """
+    with open(results_path(directory, dim, front_type, 1), "w") as f:
+        for front_size in [2 ** k for k in range(2, 10)]:
+            for repeat in range(n_repeats):
+                time_ns = 1000 * front_size ** exponent * np.exp(np.random.normal(0, 0.05))
+                f.write(json.dumps({"dim": dim, "front_type": front_type, "m": 1, "front_size": front_size,
+                                    "repeat": repeat, "warmup": False, "time_ns": time_ns,
+                                    "n_kink_points": 1}) + "\n")
+
+
+class ComplexityReportTestCase(unittest.TestCase):
+    def test_report(self):
+        np.random.seed(0)
+        with tempfile.TemporaryDirectory() as directory:
+            write_runs(directory, 3, "linear", 1.1)
+            write_runs(directory, 4, "adversarial", 2.5)
+            report = complexity_report(directory, update_baseline=True)
+            self.assertEqual(len(report), 2)
+            for _, row in report.iterrows():
+                expected = 1.1 if row["dim"] == 3 else 2.5
+                self.assertLess(row["ci_low"], expected)
+                self.assertGreater(row["ci_high"], expected)
+            self.assertTrue(os.path.exists(os.path.join(directory, BASELINE_FILE)))
+
+            # within the theoretical bound of 3, but slower than the baseline
+            write_runs(directory, 4, "adversarial", 3)
+            with self.assertRaises(ComplexityRegression) as context:
+                complexity_report(directory)
+            self.assertIn("dim=4_front=adversarial_m=1", str(context.exception))
+
+    def test_above_theory(self):
+        np.random.seed(1)
+        with tempfile.TemporaryDirectory() as directory:
+            write_runs(directory, 3, "spherical", 2)
+            self.assertRaises(ComplexityRegression, complexity_report, directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import itertools
+import unittest
+import numpy as np
+
+from point_sampling import get_non_dominated_points
+from main import get_kink_points
+import main
+
+
+def kink_points_brute_force(front, dim):
+    """ Returns the kink points as the minimal points of the grid spanned by the coordinates of the front
+    (and 0) that are not strictly dominated by any point of the front. """
+    front = np.asarray(front, dtype=float).reshape(-1, dim)
+    axes = [np.unique(np.concatenate([[0], front[:, i]])) for i in range(dim)]
+    grid = np.array(list(itertools.product(*[range(len(axis)) for axis in axes])))
+    coordinates = np.stack([axes[i][grid[:, i]] for i in range(dim)], axis=1)
+
+    def free(indices):
+        points = np.stack([axes[i][indices[:, i]] for i in range(dim)], axis=1)
+        return ~(front[np.newaxis, :, :] > points[:, np.newaxis, :]).all(axis=2).any(axis=1)
+
+    minimal = free(grid)
+    for i in range(dim):
+        lower = grid.copy()
+        lower[:, i] -= 1
+        can_decrease = grid[:, i] > 0
+        minimal[can_decrease] &= ~free(lower[can_decrease])
+    return sorted(map(tuple, coordinates[minimal].tolist()))
+
+
+def random_fronts(n_fronts, max_points, dim):
+    """ Yields random fronts from all the generators of point_sampling, also with rounded coordinates,
+    so that the points share coordinate values. """
+    modes = ["random", "linear", "spherical", "worst_case", "adversarial"]
+    for k in range(n_fronts):
+        mode = modes[k % len(modes)]
+        front = get_non_dominated_points(np.random.randint(1, max_points + 1), dim, mode=mode)
+        if k % 2 == 1:
+            front = get_non_dominated_points(len(front), dim, mode="random") if mode == "random" else \
+                [tuple(float(x) for x in np.maximum(np.round(p, 1), 0.1)) for p in front]
+        yield mode, front
+
+
+class EngineTestCase(unittest.TestCase):
+    def test_differential(self):
+        np.random.seed(0)
+        for dim in range(3, 6):
+            for mode, front in random_fronts(24, 12 if dim < 5 else 8, dim):
+                fast = get_kink_points(front, dim)
+                checked = get_kink_points(front, dim, engine="checked")
+                self.assertTrue(np.array_equal(fast, checked), (mode, front))
+                self.assertEqual(sorted(map(tuple, fast.tolist())), kink_points_brute_force(front, dim),
+                                 (mode, front))
+
+    def test_checked_engine_checks(self):
+        rec = main.get_kink_points_rec
+        get_kink_points([(1, 1, 1), (2, 2, 0.5)], 3, engine="checked")
+        # the engine is chosen per call, without replacing the functions of the module
+        self.assertIs(main.get_kink_points_rec, rec)
+        # the points have to be sorted by the last coordinate
+        self.assertRaises(AssertionError, main.get_kink_points_rec, [(1, 1, 1), (2, 2, 2)], 3, True)
+        self.assertRaises(AssertionError, main.get_kink_points_rec, [(1, 1, 1, 1), (2, 2, 2, 2)], 4, True)
+        main.get_kink_points_rec([(1, 1, 1), (2, 2, 2)], 3)
+        self.assertRaises(ValueError, get_kink_points, [(1, 1, 1)], 3, engine="slow")
+
+    def test_checked_parallel(self):
+        np.random.seed(1)
+        front = get_non_dominated_points(25, 4, mode="spherical")
+        self.assertTrue(np.array_equal(get_kink_points(front, 4, workers=2, engine="checked"),
+                                       get_kink_points(front, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
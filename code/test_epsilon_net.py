@@ -2,28 +2,40 @@ import unittest
 import numpy as np
 from scipy.spatial import cKDTree
 
-from point_sampling import epsilon_net, spherical_front, epsilon_net_from_square
+from point_sampling import spherical_front, epsilon_net_chunks, epsilon_net_size
 
 
 class MyTestCase(unittest.TestCase):
     def test_epsilon_net(self):
-
-        for d in range(2, 7):
+        # in 6D the net has about 3.5e9 points, too many to check in a test
+        for d in range(2, 6):
             h = 0.1
             r = 5
-            net = epsilon_net_from_square(r, h, d)
-            print(f"Max min dist for {d}D ({len(net)} points):", end=" ")
+            print(f"Max min dist for {d}D ({epsilon_net_size(r, h, d)} points):", end=" ")
 
             pts = spherical_front(r, 1000 * 2 ** d, d)
-            # find the min distance for each of the points to the net
-            tree = cKDTree(net)
-            min_dists, _ = tree.query(pts, k=1)
+            # find the min distance for each of the points to the net, one chunk of the net at a time; only
+            # the distances up to h matter, and bounding them keeps the chunks far from a point cheap
+            min_dists = np.full(len(pts), np.inf)
+            for chunk in epsilon_net_chunks(r, h, d):
+                chunk_dists, _ = cKDTree(chunk).query(pts, k=1, distance_upper_bound=2 * h)
+                np.minimum(min_dists, chunk_dists, out=min_dists)
             max_min_dist = np.max(min_dists)
 
             self.assertLessEqual(max_min_dist, h)
 
             print(f"{max_min_dist:.6f}")
 
+    def test_epsilon_net_chunks(self):
+        for d in range(2, 6):
+            chunks = list(epsilon_net_chunks(2, 0.2, d, chunk_size=100))
+            net = np.vstack(chunks)
+            self.assertTrue(all(len(chunk) == 100 for chunk in chunks[:-1]))
+            self.assertEqual(len(net), epsilon_net_size(2, 0.2, d))
+            # no duplicates on the shared edges of the faces
+            self.assertEqual(len(np.unique(net, axis=0)), len(net))
+            np.testing.assert_allclose(np.linalg.norm(net, axis=1), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+import numpy as np
+
+from point_sampling import epsilon_net, epsilon_net_from_square
+from epsilon_net_cache import EpsilonNetCache
+
+
+class EpsilonNetCacheTestCase(unittest.TestCase):
+    def test_square_net(self):
+        cache = EpsilonNetCache()
+        for d in range(2, 5):
+            for radius in [0.5, 2, 3]:
+                net = cache.square_net(radius, 0.1 * radius, d)
+                points = np.vstack(list(net.chunks(chunk_size=50)))
+                self.assertEqual(len(points), len(net))
+                np.testing.assert_allclose(points, epsilon_net_from_square(radius, 0.1 * radius, d), atol=1e-12)
+        # the same relative epsilon in the same dimension is one unit net
+        self.assertEqual((cache.hits, cache.misses), (6, 3))
+
+    def test_recursive_net(self):
+        cache = EpsilonNetCache()
+        for radius in [1, 4]:
+            net = cache.recursive_net(radius, 0.2 * radius, 3)
+            np.testing.assert_allclose(np.vstack(list(net.chunks())), epsilon_net(radius, 0.2 * radius, 3))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction_and_large_nets(self):
+        cache = EpsilonNetCache(max_entries=2)
+        for epsilon in [0.3, 0.2, 0.1]:
+            cache.square_net(1, epsilon, 3)
+        self.assertEqual(len(cache), 2)
+
+        cache = EpsilonNetCache(max_bytes=1000)
+        net = cache.square_net(1, 0.05, 3)
+        self.assertIsNone(net.unit_net)
+        self.assertEqual(len(np.vstack(list(net.chunks()))), len(net))
+
+        net = cache.recursive_net(2, 0.1, 4)
+        self.assertIsNone(net.unit_net)
+        chunks = list(net.chunks(chunk_size=100))
+        self.assertTrue(all(len(chunk) == 100 for chunk in chunks[:-1]))
+        np.testing.assert_allclose(np.vstack(chunks), epsilon_net(2, 0.1, 4))
+        self.assertEqual(len(cache), 0)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            net = EpsilonNetCache(directory=directory).square_net(2, 0.1, 4)
+            # a new cache, e.g. in another process, maps the same file
+            loaded = EpsilonNetCache(directory=directory).square_net(1, 0.05, 4)
+            self.assertIsInstance(loaded.unit_net, np.memmap)
+            np.testing.assert_array_equal(loaded.unit_net, net.unit_net)
+
+            # nets larger than max_bytes are written to the directory chunk by chunk
+            net = EpsilonNetCache(max_bytes=1000, directory=directory).recursive_net(3, 0.3, 4)
+            self.assertIsInstance(net.unit_net, np.memmap)
+            np.testing.assert_allclose(np.vstack(list(net.chunks())), epsilon_net(3, 0.3, 4))
+            del net, loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+import csv
+import io
+import time
+import threading
+import unittest
+import numpy as np
+
+from point_sampling import get_non_dominated_points, sample_random_dominated_point
+from main import (get_kink_points, dist_to_kink_points, dist_to_kink_points_batch, IncrementalKinkSet,
+                  distance_to_pareto_front, distance_to_pareto_front_lazy, stream_distances_to_pareto_front,
+                  KinkPointCache, KinkLimitExceeded, DeadlineExceeded, KinkBudgetExceeded, kink_limits)
+import main
+from kink_index import KinkIndex
+
+
+class KinkPointsTestCase(unittest.TestCase):
+    def test_batch_distances(self):
+        np.random.seed(0)
+        for dim in range(3, 6):
+            for front_type in ["linear", "spherical", "worst_case"]:
+                front = get_non_dominated_points(20, dim, mode=front_type)
+                test_points = [sample_random_dominated_point(front, dim) for _ in range(30)]
+                kink_points = get_kink_points(front, dim)
+
+                expected = [dist_to_kink_points(kink_points, point, dim) for point in test_points]
+                for chunk_size in [1, 7, 10_000]:
+                    distances = dist_to_kink_points_batch(kink_points, test_points, dim, chunk_size)
+                    self.assertEqual(list(distances), expected)
+
+    def test_kink_index(self):
+        np.random.seed(1)
+        for dim in range(3, 6):
+            for front_type in ["linear", "spherical", "worst_case"]:
+                front = get_non_dominated_points(30, dim, mode=front_type)
+                test_points = [sample_random_dominated_point(front, dim) for _ in range(30)]
+                kink_points = get_kink_points(front, dim)
+
+                expected = [dist_to_kink_points(kink_points, point, dim) for point in test_points]
+                for leaf_size in [1, 4, 256]:
+                    index = KinkIndex(kink_points, dim, leaf_size=leaf_size)
+                    self.assertEqual(list(index.distances(test_points)), expected)
+
+    def test_incremental_kink_set(self):
+        np.random.seed(2)
+        for dim in range(2, 6):
+            kink_set = IncrementalKinkSet(dim)
+            for step in range(60):
+                if len(kink_set.points) > 0 and np.random.random() < 0.3:
+                    kink_set.remove(kink_set.points[np.random.randint(len(kink_set.points))])
+                else:
+                    # rounded coordinates, so that the points share coordinate values
+                    point = tuple(float(x) for x in np.round(np.random.uniform(0.05, 1, dim), 1))
+                    kink_set.insert(point)
+
+                expected = get_kink_points(list(kink_set.points), dim)
+                self.assertEqual(sorted(kink_set.kink_points), sorted(map(tuple, expected.tolist())))
+
+        # a dominated point is dropped and does not come back when its dominator is removed
+        kink_set = IncrementalKinkSet(3, [(1.0, 1.0, 1.0), (2.0, 2.0, 2.0)])
+        kink_set.remove((2.0, 2.0, 2.0))
+        self.assertEqual((len(kink_set.points), list(kink_set.kink_points)), (0, [(0, 0, 0)]))
+
+    def test_incremental_kink_set_cache(self):
+        np.random.seed(3)
+        front = get_non_dominated_points(15, 4, mode="spherical")
+        kink_set = IncrementalKinkSet(4, front, cache_size=2)
+        expected = sorted(map(tuple, get_kink_points(front, 4).tolist()))
+        for point in front[:5] * 2:
+            kink_set.remove(point)
+            kink_set.insert(point)
+            self.assertEqual(sorted(kink_set.kink_points), expected)
+            self.assertLessEqual(len(kink_set.box_cache), 2)
+
+    def test_kink_points_array(self):
+        np.random.seed(4)
+        for dim in range(3, 6):
+            front = get_non_dominated_points(20, dim, mode="spherical")
+            kink_points = get_kink_points(front, dim)
+            self.assertEqual(kink_points.dtype, np.float64)
+            self.assertEqual(kink_points.shape[1], dim)
+            self.assertTrue(kink_points.flags["C_CONTIGUOUS"])
+
+    def test_parallel_kink_points(self):
+        np.random.seed(5)
+        for dim in range(4, 6):
+            for front_type in ["spherical", "worst_case"]:
+                front = get_non_dominated_points(25, dim, mode=front_type)
+                expected = get_kink_points(front, dim)
+                self.assertTrue(np.array_equal(get_kink_points(front, dim, workers=2), expected))
+
+    def test_lazy_distance(self):
+        np.random.seed(6)
+        for dim in range(3, 6):
+            for front_type in ["linear", "spherical", "worst_case"]:
+                front = get_non_dominated_points(20, dim, mode=front_type)
+                for _ in range(10):
+                    test_point = sample_random_dominated_point(front, dim)
+                    self.assertEqual(distance_to_pareto_front_lazy(front, test_point),
+                                     distance_to_pareto_front(front, test_point))
+
+    def test_stream_distances(self):
+        np.random.seed(7)
+        for dim in range(3, 6):
+            front = get_non_dominated_points(20, dim, mode="spherical")
+            test_points = [sample_random_dominated_point(front, dim) for _ in range(25)]
+            test_points += [tuple(np.random.uniform(0, 1.5, dim)) for _ in range(5)]
+            expected = [distance_to_pareto_front(front, point) for point in test_points]
+
+            text = io.StringIO()
+            csv.writer(text).writerows(test_points)
+            text.seek(0)
+            for query_points in [test_points, np.array(test_points), csv.reader(text)]:
+                chunks = list(stream_distances_to_pareto_front(front, query_points, chunk_size=7))
+                self.assertEqual([len(chunk) for chunk in chunks], [7, 7, 7, 7, 2])
+                self.assertEqual(list(np.concatenate(chunks)), expected)
+
+            # a front loaded as an array gives the same kink points and distances
+            array_front = np.array(front)
+            self.assertTrue(np.array_equal(get_kink_points(array_front, dim), get_kink_points(front, dim)))
+            chunks = stream_distances_to_pareto_front(array_front, test_points, chunk_size=7, cache=False)
+            self.assertEqual(list(np.concatenate(list(chunks))), expected)
+
+    def test_kink_point_cache(self):
+        np.random.seed(8)
+        fronts = [get_non_dominated_points(15, 4, mode="spherical") for _ in range(3)]
+        cache = KinkPointCache(max_entries=2)
+        for front in fronts + fronts[::-1]:
+            test_point = sample_random_dominated_point(front, 4)
+            self.assertEqual(distance_to_pareto_front(front, test_point, cache=cache),
+                             distance_to_pareto_front(front, test_point, cache=False))
+            self.assertLessEqual(len(cache), 2)
+        # the two most recent fronts are hits after reversing the order, the first one was evicted
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        # the same front in a different order is the same entry
+        kink_points = cache.get_kink_points(fronts[0][::-1], 4)
+        self.assertEqual(cache.hits, 3)
+        self.assertFalse(kink_points.flags["WRITEABLE"])
+
+        cache = KinkPointCache(max_bytes=kink_points.nbytes)
+        cache.get_kink_points(fronts[0], 4)
+        cache.get_kink_points(fronts[1], 4)
+        self.assertLessEqual(cache.nbytes, kink_points.nbytes)
+        self.assertLessEqual(len(cache), 1)
+
+    def test_adversarial_front(self):
+        # the 4D lower bound construction of the thesis with n = 2m points has m^2 + 6m + 1 kink points
+        for m in range(1, 12):
+            front = get_non_dominated_points(2 * m, 4, mode="adversarial")
+            self.assertEqual(len(get_kink_points(front, 4)), m ** 2 + 6 * m + 1)
+
+    def test_kink_limits(self):
+        np.random.seed(9)
+        for dim in range(3, 6):
+            front = get_non_dominated_points(20, dim, mode="spherical")
+            expected = get_kink_points(front, dim)
+
+            with self.assertRaises(DeadlineExceeded):
+                get_kink_points(front, dim, deadline=time.monotonic() - 1)
+            with self.assertRaises(KinkBudgetExceeded):
+                get_kink_points(front, dim, max_kink_points=len(expected) - 1)
+            self.assertIsNone(main.active_limits.get())
+
+            # generous limits do not change the result, also when the sweep is split into segments
+            limits = dict(deadline=time.monotonic() + 60, max_kink_points=len(expected))
+            self.assertTrue(np.array_equal(get_kink_points(front, dim, **limits), expected))
+            if dim >= 4:
+                self.assertTrue(np.array_equal(get_kink_points(front, dim, workers=2, **limits), expected))
+                with self.assertRaises(DeadlineExceeded):
+                    get_kink_points(front, dim, workers=2, deadline=time.monotonic() - 1)
+                # the budget bounds the kink points of all the segments together
+                with self.assertRaises(KinkBudgetExceeded):
+                    get_kink_points(front, dim, workers=4, max_kink_points=len(expected) // 2)
+
+            fallback = get_kink_points(front, dim, max_kink_points=1, fallback=lambda points, n_dim: "approximate")
+            self.assertEqual(fallback, "approximate")
+
+    def test_kink_limits_state(self):
+        np.random.seed(10)
+        front = get_non_dominated_points(15, 4, mode="spherical")
+        test_point = sample_random_dominated_point(front, 4)
+        cache = KinkPointCache()
+
+        # an interrupted computation stores nothing in the cache
+        with self.assertRaises(KinkLimitExceeded):
+            distance_to_pareto_front(front, test_point, cache=cache, max_kink_points=1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(distance_to_pareto_front(front, test_point, cache=cache, max_kink_points=1,
+                                                  fallback=lambda front, point: -1.0), -1.0)
+        self.assertEqual(distance_to_pareto_front(front, test_point, cache=cache),
+                         distance_to_pareto_front(front, test_point, cache=False))
+
+        # a removal interrupted while computing the kink points of its box leaves the set unchanged
+        kink_set = IncrementalKinkSet(4, front, cache_size=0)
+        points, kink_points = sorted(kink_set.points), sorted(kink_set.kink_points)
+        with self.assertRaises(KinkLimitExceeded), kink_limits(max_kink_points=0):
+            kink_set.remove(front[0])
+        self.assertEqual((sorted(kink_set.points), sorted(kink_set.kink_points)), (points, kink_points))
+        kink_set.remove(front[0])
+        expected = get_kink_points(front[1:], 4)
+        self.assertEqual(sorted(kink_set.kink_points), sorted(map(tuple, expected.tolist())))
+
+        # nested limits keep the stricter ones and are restored on exit
+        with kink_limits(deadline=10.0):
+            with kink_limits(deadline=20.0, max_kink_points=5) as limits:
+                self.assertEqual((limits.deadline, limits.max_kink_points), (10.0, 5))
+            outer = main.active_limits.get()
+            self.assertEqual((outer.deadline, outer.max_kink_points), (10.0, None))
+        self.assertIsNone(main.active_limits.get())
+
+    def test_kink_limits_threads(self):
+        np.random.seed(11)
+        front = get_non_dominated_points(20, 4, mode="spherical")
+        expected = get_kink_points(front, 4)
+        a_entered, b_entered, a_exited = threading.Event(), threading.Event(), threading.Event()
+        results = {}
+
+        def thread_a():
+            with kink_limits(max_kink_points=5):
+                a_entered.set()
+                b_entered.wait()
+                results["a"] = main.active_limits.get().max_kink_points
+            a_exited.set()
+
+        def thread_b():
+            a_entered.wait()
+            with kink_limits(deadline=time.monotonic() + 60):
+                b_entered.set()
+                # the budget of the other thread does not apply here
+                results["b"] = len(get_kink_points(front, 4))
+                a_exited.wait()
+            results["b_after"] = main.active_limits.get()
+
+        threads = [threading.Thread(target=thread_a), threading.Thread(target=thread_b)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {"a": 5, "b": len(expected), "b_after": None})
+        self.assertIsNone(main.active_limits.get())
+        self.assertTrue(np.array_equal(get_kink_points(front, 4), expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
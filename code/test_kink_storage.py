@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from point_sampling import get_non_dominated_points, sample_random_dominated_point
+from main import get_kink_points, distance_to_pareto_front, stream_distances_to_pareto_front
+from kink_storage import save_kink_points, load_kink_points, metadata_path
+from utils import front_hash
+
+
+class KinkStorageTestCase(unittest.TestCase):
+    def test_save_and_load(self):
+        np.random.seed(0)
+        with tempfile.TemporaryDirectory() as directory:
+            for dim in range(3, 6):
+                front = get_non_dominated_points(20, dim, mode="spherical")
+                kink_points = get_kink_points(front, dim)
+                path = os.path.join(directory, f"kink_points_{dim}.npy")
+                save_kink_points(path, kink_points, front, dim)
+
+                loaded = load_kink_points(path, front)
+                self.assertIsInstance(loaded, np.memmap)
+                self.assertTrue(np.array_equal(loaded, kink_points))
+
+                test_points = [sample_random_dominated_point(front, dim) for _ in range(10)]
+                expected = [distance_to_pareto_front(front, point) for point in test_points]
+                self.assertEqual([distance_to_pareto_front(front, point, loaded) for point in test_points],
+                                 expected)
+                distances = np.concatenate(list(stream_distances_to_pareto_front(front, test_points,
+                                                                                 kink_points=loaded)))
+                self.assertEqual(list(distances), expected)
+                del loaded
+
+    def test_front_mismatch(self):
+        np.random.seed(1)
+        front = get_non_dominated_points(10, 4, mode="linear")
+        other_front = get_non_dominated_points(10, 4, mode="linear")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kink_points.npy")
+            save_kink_points(path, get_kink_points(front, 4), front, 4)
+            self.assertRaises(ValueError, load_kink_points, path, other_front)
+            # the order of the points does not matter
+            load_kink_points(path, front[::-1])
+
+            with open(metadata_path(path), "w") as f:
+                f.write('{"version": 0}')
+            self.assertRaises(ValueError, load_kink_points, path)
+
+    def test_rewrite(self):
+        np.random.seed(2)
+        fronts = [get_non_dominated_points(10, 4, mode="spherical") for _ in range(2)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kink_points.npy")
+            save_kink_points(path, get_kink_points(fronts[0], 4), fronts[0], 4)
+            loaded = load_kink_points(path, fronts[0])
+
+            # the file is replaced, not overwritten, so an open memory map keeps the old kink points
+            save_kink_points(path, get_kink_points(fronts[1], 4), fronts[1], 4)
+            self.assertTrue(np.array_equal(loaded, get_kink_points(fronts[0], 4)))
+            self.assertTrue(np.array_equal(load_kink_points(path, fronts[1]), get_kink_points(fronts[1], 4)))
+            self.assertEqual(sorted(os.listdir(directory)), ["kink_points.npy", "kink_points.npy.json"])
+            del loaded
+
+    def test_front_hash(self):
+        front = [(1, 2, 3), (3, 2, 1)]
+        self.assertEqual(front_hash(front, 3), front_hash([(3, 2, 1), (1, 2, 3), (1, 2, 3)], 3))
+        self.assertNotEqual(front_hash(front, 3), front_hash([(1, 2, 3), (3, 2, 2)], 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+
+from test import net_has_undominated_point
+
+
+def counted_chunks(chunks, counter):
+    for chunk in chunks:
+        counter.append(len(chunk))
+        yield chunk
+
+
+class NetVerifierTestCase(unittest.TestCase):
+    def setUp(self):
+        self.front = [(1.0, 2.0, 2.0), (2.0, 1.0, 2.0), (2.0, 2.0, 1.0)]
+        self.test_point = (0.5, 0.5, 0.5)
+        # all the points of these chunks, shifted by the test point, are dominated by the front
+        self.dominated = [np.random.RandomState(i).uniform(0, 0.5, (50, 3)) for i in range(20)]
+        self.undominated = np.array([[1.0, 1.0, 1.0]])
+
+    def test_serial(self):
+        for workers in [None, 1, 4]:
+            self.assertFalse(net_has_undominated_point(self.front, self.test_point, self.dominated[:1], workers))
+            self.assertTrue(net_has_undominated_point(self.front, self.test_point, [self.undominated], workers))
+        self.assertFalse(net_has_undominated_point(self.front, self.test_point, self.dominated, workers=1))
+        self.assertTrue(net_has_undominated_point(self.front, self.test_point, self.dominated + [self.undominated],
+                                                  workers=1))
+
+    def test_parallel(self):
+        self.assertFalse(net_has_undominated_point(self.front, self.test_point, self.dominated, workers=2))
+        self.assertTrue(net_has_undominated_point(self.front, self.test_point, self.dominated + [self.undominated],
+                                                  workers=2))
+
+    def test_early_stop(self):
+        chunks = [self.undominated] + self.dominated * 10
+        for workers in [1, 2]:
+            counter = []
+            self.assertTrue(net_has_undominated_point(self.front, self.test_point, counted_chunks(chunks, counter),
+                                                      workers))
+            # at most two chunks per worker are in flight when the first result comes in
+            self.assertLessEqual(len(counter), max(2, 2 * workers + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from point_sampling import remove_dominated_points, sample_dominated_points, get_non_dominated_points
+from utils import weakly_dominates, dominated_mask
+
+
+def remove_dominated_points_brute_force(points):
+    return [tuple(p1) for p1 in points
+            if not any(weakly_dominates(p2, p1) and not np.array_equal(p1, p2) for p2 in points)]
+
+
+class PointSamplingTestCase(unittest.TestCase):
+    def test_remove_dominated_points(self):
+        np.random.seed(0)
+        for dim in range(2, 7):
+            for decimals in [1, 2, 8]:
+                points = np.round(np.random.random((150, dim)), decimals)
+                # duplicates of some of the points
+                points = np.vstack([points, points[:20]])
+                expected = remove_dominated_points_brute_force(points)
+                self.assertEqual(remove_dominated_points(points), expected)
+                self.assertEqual(remove_dominated_points(points.tolist()), [tuple(p) for p in expected])
+
+    def test_sample_dominated_points(self):
+        np.random.seed(1)
+        # the union of the boxes has area 0.75 and the overlap of the boxes [0, 0.5]^2 has area 0.25
+        points = sample_dominated_points([(1, 0.5), (0.5, 1)], 2, 60_000)
+        self.assertEqual(points.shape, (60_000, 2))
+        self.assertAlmostEqual(np.mean((points <= 0.5).all(axis=1)), 1 / 3, delta=0.01)
+        self.assertAlmostEqual(np.mean(points[:, 0] > 0.5), 1 / 3, delta=0.01)
+
+        for dim in range(2, 7):
+            front = get_non_dominated_points(20, dim, mode="spherical")
+            points = sample_dominated_points(front, dim, 100)
+            self.assertEqual(points.shape, (100, dim))
+            self.assertTrue(dominated_mask(front, points).all())
+            self.assertTrue(((points >= 0) & (points <= 1)).all())
+
+        self.assertRaises(ValueError, sample_dominated_points, [(1, 0), (0, 1)], 2, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+import main
+from point_sampling import get_non_dominated_points
+from main import get_kink_points
+from profiling import profiling, profile_kink_points, SweepProfile
+
+
+class ProfilingTestCase(unittest.TestCase):
+    def test_profile_kink_points(self):
+        np.random.seed(0)
+        for dim in range(3, 6):
+            front = get_non_dominated_points(30, dim, mode="spherical")
+            events = []
+            kink_points, report = profile_kink_points(front, dim, callback=events.append)
+            self.assertTrue(np.array_equal(kink_points, get_kink_points(front, dim)))
+
+            levels = report["levels"]
+            self.assertEqual(max(levels), dim)
+            self.assertEqual(levels[dim]["calls"], 1)
+            self.assertEqual(levels[dim]["subproblem_sizes"], [30])
+            self.assertEqual(levels[dim]["kink_points"], len(kink_points))
+            self.assertGreater(levels[dim]["candidates"], 0)
+            if dim == 3:
+                self.assertGreater(len(report["removed_3d"]), 0)
+            else:
+                self.assertGreater(len(report["removed_nd"]), 0)
+                self.assertLessEqual(levels[dim]["candidate_time_ns"], levels[dim]["time_ns"])
+
+            self.assertEqual(len([e for e in events if e["event"] == "subproblem"]),
+                             sum(level["calls"] for level in levels.values()))
+            self.assertEqual(len([e for e in events if e["event"] == "remove_dominated_3d"]),
+                             len(report["removed_3d"]))
+
+    def test_subproblems(self):
+        # removing points from an incremental set solves lower-dimensional subproblems
+        np.random.seed(1)
+        front = get_non_dominated_points(20, 4, mode="spherical")
+        kink_set = main.IncrementalKinkSet(4, front[5:])
+        with profiling() as profile:
+            for point in front[:5]:
+                kink_set.insert(point)
+                kink_set.remove(point)
+        self.assertEqual(profile.calls[4], 5)
+        self.assertTrue(all(size <= len(kink_set.points) for size in profile.subproblem_sizes[4]))
+        self.assertGreater(profile.candidates[4], 0)
+
+    def test_large_slice_deletions(self):
+        profile = SweepProfile()
+        # only the removals of at least an eighth, but not all, of the list are counted
+        for n_removed, size in [(2, 16), (1, 16), (16, 16), (0, 0)]:
+            profile.record_removed_3d(n_removed, size)
+        self.assertEqual(profile.report()["large_slice_deletions"], 1)
+
+    def test_functions_restored(self):
+        rec, insert = main.get_kink_points_rec, main.IncrementalKinkSet.insert
+        with self.assertRaises(ValueError):
+            with profiling():
+                self.assertIsNot(main.get_kink_points_rec, rec)
+                raise ValueError
+        self.assertIs(main.get_kink_points_rec, rec)
+        self.assertIs(main.IncrementalKinkSet.insert, insert)
+
+
+if __name__ == '__main__':
+    unittest.main()
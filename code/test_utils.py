@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from sortedcontainers import SortedList
+
+from utils import (weakly_dominates, strictly_dominates, state_dominates_point, staircase_dominates_point,
+                   dominated_mask, dominance_counts, minimal_points, DominanceIndex)
+
+
+class DominanceTestCase(unittest.TestCase):
+    def test_array_predicates(self):
+        np.random.seed(1)
+        for dim in range(2, 6):
+            state = np.round(np.random.random((40, dim)), 1)
+            points = np.round(np.random.random((60, dim)), 1)
+            state_tuples = [tuple(p) for p in state]
+
+            expected = [any(weakly_dominates(s, tuple(p)) for s in state_tuples) for p in points]
+            counts = [sum(weakly_dominates(s, tuple(p)) for s in state_tuples) for p in points]
+            for block_size in [1, 50, 10_000]:
+                self.assertEqual(list(dominated_mask(state, points, block_size)), expected)
+                self.assertEqual(list(dominance_counts(state, points, block_size)), counts)
+
+            for p in points:
+                p_tuple = tuple(p)
+                self.assertEqual(list(weakly_dominates(state, p)), [weakly_dominates(s, p_tuple) for s in state_tuples])
+                self.assertEqual(list(strictly_dominates(p, state)), [strictly_dominates(p_tuple, s) for s in state_tuples])
+                self.assertEqual(state_dominates_point(state, p), state_dominates_point(state_tuples, p_tuple))
+
+    def test_dominance_index(self):
+        np.random.seed(0)
+        for dim in range(2, 6):
+            points = set(tuple(float(x) for x in p) for p in np.round(np.random.random((200, dim)), 1))
+            index = DominanceIndex(dim, points)
+            self.assertEqual(len(index), len(points))
+
+            for query in np.round(np.random.random((50, dim)), 1):
+                query = tuple(float(x) for x in query)
+                strict = [p for p in points if strictly_dominates(query, p)]
+                weak = [p for p in points if weakly_dominates(query, p)]
+                self.assertEqual(sorted(index.dominated_points(query, "strict")), sorted(strict))
+                self.assertEqual(sorted(index.dominated_points(query, "weak")), sorted(weak))
+                self.assertEqual(index.dominates_point(query), state_dominates_point(points, query))
+
+    def test_minimal_points(self):
+        np.random.seed(2)
+        for dim in range(1, 6):
+            for _ in range(20):
+                points = [tuple(float(x) for x in p) for p in np.round(np.random.random((30, dim)), 1)]
+                blockers = [tuple(float(x) for x in p) for p in np.round(np.random.random((10, dim)), 1)]
+                others = set(points) | set(blockers)
+                expected = {p for p in points if not any(q != p and weakly_dominates(p, q) for q in others)
+                            and p not in blockers}
+                self.assertEqual(sorted(minimal_points(points, blockers)), sorted(expected))
+        self.assertEqual(minimal_points([]), [])
+        self.assertEqual(minimal_points([(), ()]), [()])
+        self.assertEqual(minimal_points([()], [()]), [])
+
+    def test_staircase_dominates_point(self):
+        staircase = SortedList([(0.1, 0.9), (0.4, 0.6), (0.8, 0.2)])
+        self.assertTrue(staircase_dominates_point(staircase, (0.4, 0.6)))
+        self.assertTrue(staircase_dominates_point(staircase, (0.3, 0.5)))
+        self.assertFalse(staircase_dominates_point(staircase, (0.5, 0.6)))
+        self.assertFalse(staircase_dominates_point(staircase, (0.9, 0.1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
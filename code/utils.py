@@ -1,3 +1,23 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from sortedcontainers import SortedList, SortedKeyList
+
+inf = float('inf')
+
+# maximal number of (state point, query point) pairs compared at once in dominated_mask
+BLOCK_SIZE = 2 ** 20
+
+
+def front_hash(points, dim):
+    """ Returns a hex digest identifying the set of points in dim dimensions, independent of the
+    order of the points and of duplicates. """
+    points = np.unique(np.asarray(points, dtype=float).reshape(-1, dim), axis=0)
+    digest = hashlib.sha256(str(dim).encode())
+    digest.update(np.ascontiguousarray(points).tobytes())
+    return digest.hexdigest()
+
+
 def strictly_dominates_except_last(p1, p2, dim):
     """ Returns True if p1 strictly dominates p2 in first dim - 1 dimensions while having
     a smaller last dimension.
@@ -6,21 +26,121 @@ def strictly_dominates_except_last(p1, p2, dim):
 
 
 def weakly_dominates(point1, point2):
-    """ Returns True if p1 weakly dominates p2. """
+    """ Returns True if p1 weakly dominates p2.
+    If either of them is an (n, D) array, returns a boolean array with the result for every row. """
+    if isinstance(point1, np.ndarray) or isinstance(point2, np.ndarray):
+        return compare_points(point1, point2, np.greater_equal)
     return all([p1 >= p2 for p1, p2 in zip(point1, point2)])
 
 def strictly_dominates(point1, point2):
-    """ Returns True if p1 strictly dominates p2. """
+    """ Returns True if p1 strictly dominates p2.
+    If either of them is an (n, D) array, returns a boolean array with the result for every row. """
+    if isinstance(point1, np.ndarray) or isinstance(point2, np.ndarray):
+        return compare_points(point1, point2, np.greater)
     return all([p1 > p2 for p1, p2 in zip(point1, point2)])
 
 
+def compare_points(points1, points2, compare):
+    """ Returns where compare holds in all the coordinates, for points or (n, D) arrays of points
+    broadcast against each other. As with zip, only the common coordinates are compared. """
+    points1 = np.asarray(points1, dtype=float)
+    points2 = np.asarray(points2, dtype=float)
+    dim = min(points1.shape[-1], points2.shape[-1])
+    result = compare(points1[..., :dim], points2[..., :dim]).all(axis=-1)
+    return result if result.ndim else bool(result)
+
+
+def dominated_mask(state, points, block_size=BLOCK_SIZE):
+    """ Returns a boolean array telling for each of the (m, D) points whether any point of the (n, D)
+    state weakly dominates it. The points are compared in blocks of at most block_size pairs. """
+    return reduce_dominance(state, points, block_size, np.any, bool)
+
+
+def dominance_counts(state, points, block_size=BLOCK_SIZE):
+    """ Returns an integer array with the number of points of the (n, D) state that weakly dominate
+    each of the (m, D) points. The points are compared in blocks of at most block_size pairs. """
+    return reduce_dominance(state, points, block_size, np.sum, np.int64)
+
+
+def reduce_dominance(state, points, block_size, reduce, dtype):
+    """ Returns an array of the given dtype with reduce applied, for each of the (m, D) points, to the
+    booleans telling which points of the (n, D) state weakly dominate it. The points are compared in
+    blocks of at most block_size pairs. """
+    state = np.asarray(state, dtype=float)
+    points = np.asarray(points, dtype=float)
+    result = np.zeros(len(points), dtype=dtype)
+    if len(state) == 0:
+        return result
+
+    rows = max(1, block_size // len(state))
+    for start in range(0, len(points), rows):
+        block = points[start:start + rows]
+        result[start:start + rows] = reduce((state[np.newaxis, :, :] >= block[:, np.newaxis, :]).all(axis=2), axis=1)
+    return result
+
+
 def state_dominates_point(state, point):
     """ Returns True if any point in state dominates point. """
+    if isinstance(state, DominanceIndex):
+        return state.dominates_point(point)
+    if isinstance(state, np.ndarray) or isinstance(point, np.ndarray):
+        return bool(dominated_mask(state, [point])[0])
     for state_point in state:
         if weakly_dominates(state_point, point):
             return True
     return False
 
+def staircase_dominates_point(sorted_list, point):
+    """ Returns True if any point in the 2D state (sorted by the first coordinate and
+    non-dominated) weakly dominates point. """
+    # the first point with a large enough first coordinate has the largest second coordinate
+    i = bisect_x(sorted_list, point[0], "strict")
+    return i < len(sorted_list) and sorted_list[i][1] >= point[1]
+
+
+def minimal_points(points, blockers=()):
+    """ Returns the distinct points that do not weakly dominate any other point of points or of blockers.
+    Every point that a point weakly dominates comes before it in lexicographic order, so the points are
+    swept in that order and checked against a staircase of the minimal points seen so far, in
+    O(k log k) time for k points of up to three dimensions instead of comparing all the pairs. """
+    # of equal points, the blockers come first, so a point equal to a blocker is dropped
+    order = sorted([(p, False) for p in blockers] + [(p, True) for p in set(points)])
+    if not order:
+        return []
+    dim = len(order[0][0])
+
+    minimal = []
+    lowest = inf
+    staircase = SortedList() if dim == 3 else None
+    index = DominanceIndex(dim) if dim > 3 else None
+    for point, is_point in order:
+        # all the points before have a smaller or equal first coordinate
+        if dim <= 2:
+            # without coordinates (dim 0), every point weakly dominates the ones before it
+            value = point[-1] if dim > 0 else 0
+            dominates = lowest <= value
+            lowest = min(lowest, value)
+        elif dim == 3:
+            # (y, z) of the minimal points seen so far, with z decreasing in y
+            y, z = point[1], point[2]
+            i = staircase.bisect_right((y, inf))
+            dominates = i > 0 and staircase[i - 1][1] <= z
+            if not dominates:
+                start = end = staircase.bisect_left((y, -inf))
+                while end < len(staircase) and staircase[end][1] >= z:
+                    end += 1
+                del staircase[start:end]
+                staircase.add((y, z))
+        else:
+            dominates = len(index.dominated_points(point, "weak")) > 0
+            if not dominates:
+                index.add(point)
+
+        if is_point and not dominates:
+            minimal.append(point)
+    return minimal
+
+
 def get_dominated_points_bisect(sorted_list, point, domination):
     right = bisect_x(sorted_list, point[0], domination)
     left = bisect_y(sorted_list, point[1], domination)
@@ -55,3 +175,116 @@ def bisect_y(lst, el, domination="strict"):
         else:
             i = mid + 1
     return i
+
+
+class DominanceIndex:
+    """ Set of n_dim-dimensional points that answers dominance queries without scanning all of them.
+
+    The points are kept in one sorted list per coordinate. The points dominated by (or dominating)
+    a query point lie in a prefix (or suffix) of every list, so the query finds the shortest such
+    range by bisection and checks only the points in it. Points with the same coordinate are ordered
+    by the whole point, so the order does not depend on the order of insertion, and insertions and
+    removals take O(n_dim log n) time even when many points share a coordinate value.
+    """
+
+    def __init__(self, n_dim, points=()):
+        self.n_dim = n_dim
+        self.columns = [SortedKeyList(key=lambda p, i=i: (p[i], ) + p) for i in range(n_dim)]
+        for point in points:
+            self.add(point)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __iter__(self):
+        return iter(self.columns[0])
+
+    def __getitem__(self, index):
+        return self.columns[0][index]
+
+    def __contains__(self, point):
+        return point in self.columns[0]
+
+    def add(self, point):
+        for column in self.columns:
+            column.add(point)
+
+    def remove(self, point):
+        """ Removes point from the set; raises ValueError if it is not in it. """
+        for column in self.columns:
+            column.remove(point)
+
+    def dominated_points(self, point, domination):
+        """ Returns the list of points that are dominated by point, either strictly in all the
+        coordinates or weakly. The point can have more than n_dim coordinates, in which case
+        only the first n_dim are used. This takes O(n_dim log n + m) time, where m is the length of
+        the shortest of the per-coordinate prefixes that is scanned, not O(log n + k) for k dominated
+        points as an orthant range tree would. """
+        assert domination in ["strict", "weak"]
+        if domination == "strict":
+            sizes = [column.bisect_key_left((point[i], )) for i, column in enumerate(self.columns)]
+        else:
+            sizes = [column.bisect_key_right((point[i], inf)) for i, column in enumerate(self.columns)]
+        i = min(range(self.n_dim), key=lambda j: sizes[j])
+
+        dominates = strictly_dominates if domination == "strict" else weakly_dominates
+        return [p for p in self.columns[i].islice(0, sizes[i]) if dominates(point, p)]
+
+    def dominates_point(self, point):
+        """ Returns True if any point in the set weakly dominates point. """
+        starts = [column.bisect_key_left((point[i], )) for i, column in enumerate(self.columns)]
+        i = max(range(self.n_dim), key=lambda j: starts[j])
+        return any(weakly_dominates(p, point) for p in self.columns[i].islice(starts[i]))
+
+    def points_with_value(self, i, value):
+        """ Returns an iterator over the points with the i-th coordinate equal to value. """
+        return self.columns[i].irange_key((value, ), (value, inf))
+
+
+class LRUCache:
+    """ Arrays kept by key, least recently used first. The least recently used ones are evicted when there
+    are more than max_entries of them or they take more than max_bytes (as counted by value_nbytes). """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def lookup(self, key):
+        """ Returns the value stored for the key, marking it as the most recently used, or None. """
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        """ Stores the value and evicts the least recently used entries over the limits.
+        Values larger than max_bytes are not stored at all. """
+        nbytes = self.value_nbytes(value)
+        if key in self.entries or nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        self.entries[key] = value
+        self.nbytes += nbytes
+        while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= self.value_nbytes(evicted)
+
+    def value_nbytes(self, value):
+        return value.nbytes
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
@@ -2,7 +2,8 @@ import math
 import numpy as np
 import matplotlib.pyplot as plt
 
-from point_sampling import epsilon_net, spherical_front
+from point_sampling import spherical_front
+from epsilon_net_cache import net_cache
 from tikz_3d_visualization import transform
 
 
@@ -10,8 +11,7 @@ def test_epsilon_net():
     for d in range(2, 11):
         h = 1
         r = 10
-        net = epsilon_net(r, h, d)
-        net = np.array(net)
+        net = np.vstack(list(net_cache.recursive_net(r, h, d).chunks()))
         print(f"net calculated: {net.shape}")
         pts = spherical_front(r, 2000, d)
 